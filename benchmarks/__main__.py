@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from evenflow.logs import setup_logging
+
+from .corpus import SyntheticSite
+from .micro import run_micro, to_dict
+from .pipeline import run_pipeline
+from .record import record
+from .server import Faults
+
+
+def read_cli_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="offline evenflow benchmarks")
+    parser.add_argument('--log-level', default="WARNING", type=str)
+    parser.add_argument('--output', help="write the results as json to this file", type=str)
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    for name in ["pipeline", "micro"]:
+        sub = commands.add_parser(name)
+        sub.add_argument('--sites', default=4, type=int)
+        sub.add_argument('--pages', default=3, type=int)
+        sub.add_argument('--entries', default=5, type=int)
+        sub.add_argument('--articles', default=10, type=int)
+        sub.add_argument('--seed', default=42, type=int)
+
+    pipeline = commands.choices["pipeline"]
+    pipeline.add_argument('--latency', help="mean response delay in seconds", default=0.02, type=float)
+    pipeline.add_argument('--error-rate', help="share of responses answered with a 503", default=0.0, type=float)
+    pipeline.add_argument('--timeout-rate', help="share of responses that never complete", default=0.0, type=float)
+    pipeline.add_argument('--parse-workers', help="0 parses on the event loop", default=None, type=int)
+    pipeline.add_argument('--db-latency', help="delay added to every stub database call", default=0.0, type=float)
+    pipeline.add_argument('--dsn', help="use a real postgres instead of the stub", default=None, type=str)
+
+    micro = commands.choices["micro"]
+    micro.add_argument('--number', default=20, type=int)
+    micro.add_argument('--sources', default=50000, type=int)
+
+    rec = commands.add_parser("record", help="save article pages into benchmarks/corpus")
+    rec.add_argument('urls', nargs='+')
+    return parser.parse_args()
+
+
+def site_from(args: argparse.Namespace) -> SyntheticSite:
+    return SyntheticSite(
+        sites=args.sites,
+        pages=args.pages,
+        entries=args.entries,
+        articles=args.articles,
+        seed=args.seed
+    )
+
+
+def main() -> int:
+    args = read_cli_args()
+    setup_logging(args.log_level)
+    loop = asyncio.get_event_loop()
+
+    if args.command == "record":
+        saved = loop.run_until_complete(record(loop, args.urls))
+        print(f"saved {saved} of {len(args.urls)} pages")
+        return 0 if saved > 0 else 1
+
+    if args.command == "micro":
+        results = to_dict(run_micro(site_from(args), args.number, args.sources))
+    else:
+        faults = Faults(args.latency, args.error_rate, args.timeout_rate, args.seed)
+        results = loop.run_until_complete(
+            run_pipeline(loop, site_from(args), faults, args.parse_workers, args.dsn, args.db_latency)
+        )
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    print(text)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            f.write(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
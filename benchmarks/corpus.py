@@ -0,0 +1,147 @@
+import glob
+import os
+import random
+
+from typing import List, Optional
+from evenflow.scrapers.feed import SiteFeed
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+WORDS = (
+    "government minister election vote report council economy market price city police court "
+    "study health school water energy climate border trade law campaign party press statement "
+    "people country week year today official source public plan budget crisis news"
+).split()
+
+ARTICLE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<meta name="description" content="{description}">
+<meta name="keywords" content="{keywords}">
+</head>
+<body>
+<nav><a href="/">home</a> <a href="/politics">politics</a> <a href="/world">world</a></nav>
+<article>
+<h1>{title}</h1>
+<p class="byline">By {author}</p>
+{paragraphs}
+</article>
+<footer>all rights reserved</footer>
+</body>
+</html>
+"""
+
+LISTING = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{name} page {page}</title></head>
+<body>
+<ul class="entries">{entries}</ul>
+{next}
+</body></html>
+"""
+
+ENTRY = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{name} section {page}.{entry}</title></head>
+<body><div class="links">{links}</div></body></html>
+"""
+
+
+def recorded_articles(directory: str = CORPUS_DIR) -> List[str]:
+    """article pages saved with `python -m benchmarks record`, served instead of the synthetic ones"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+class SyntheticSite:
+    """
+    deterministic set of sites shaped like the feeds evenflow follows:
+    listing pages link to entry pages, entry pages link to articles
+    """
+
+    def __init__(
+            self,
+            sites: int = 4,
+            pages: int = 3,
+            entries: int = 5,
+            articles: int = 10,
+            paragraphs: int = 12,
+            recorded: Optional[List[str]] = None,
+            seed: int = 42
+    ):
+        self.sites = sites
+        self.pages = pages
+        self.entries = entries
+        self.articles = articles
+        self.paragraphs = paragraphs
+        self.recorded = recorded if recorded is not None else recorded_articles()
+        self.seed = seed
+
+    @staticmethod
+    def site_name(site: int) -> str:
+        return f"site{site}"
+
+    def listing(self, base: str, site: int, page: int) -> str:
+        name = self.site_name(site)
+        entries = "".join(
+            f'<li><a class="entry" href="{base}/{name}/entry/{page}/{e}">entry {e}</a></li>'
+            for e in range(self.entries)
+        )
+        has_next = page + 1 < self.pages
+        next_link = f'<a class="next" href="{base}/{name}/list/{page + 1}">next</a>' if has_next else ""
+        return LISTING.format(name=name, page=page, entries=entries, next=next_link)
+
+    def entry(self, base: str, site: int, page: int, entry: int) -> str:
+        name = self.site_name(site)
+        links = "".join(
+            f'<p><a class="article" href="{base}/{name}/article/{page}/{entry}/{n}">article {n}</a></p>'
+            for n in range(self.articles)
+        )
+        return ENTRY.format(name=name, page=page, entry=entry, links=links)
+
+    def article(self, site: int, page: int, entry: int, n: int) -> str:
+        rnd = random.Random(f"{self.seed}/{site}/{page}/{entry}/{n}")
+        title = f"{' '.join(rnd.choice(WORDS) for _ in range(8)).capitalize()} {site}-{page}-{entry}-{n}"
+
+        if len(self.recorded) > 0:
+            html = self.recorded[rnd.randrange(len(self.recorded))]
+            start, end = html.find("<title>"), html.find("</title>")
+            if start >= 0 and end > start:
+                return html[:start + len("<title>")] + title + html[end:]
+            return html
+
+        paragraphs = "\n".join(
+            f"<p>{self.__sentence(rnd, 60).capitalize()}.</p>" for _ in range(self.paragraphs)
+        )
+        return ARTICLE.format(
+            title=title,
+            description=self.__sentence(rnd, 20),
+            keywords=", ".join(rnd.sample(WORDS, 5)),
+            author=f"{rnd.choice(WORDS).capitalize()} {rnd.choice(WORDS).capitalize()}",
+            paragraphs=paragraphs
+        )
+
+    @staticmethod
+    def __sentence(rnd: random.Random, words: int) -> str:
+        return " ".join(rnd.choice(WORDS) for _ in range(words))
+
+    def feeds(self, bases: List[str], parser: str = "html5lib") -> List[SiteFeed]:
+        """one feed per site, site i served from bases[i]"""
+        return [
+            SiteFeed(
+                name=self.site_name(site),
+                url=f"{bases[site]}/{self.site_name(site)}/list/0",
+                sel={"nextp": "a.next", "entries": "a.entry", "links": "a.article"},
+                stop_after=self.pages - 1,
+                fake_news=site % 2 == 1,
+                parser=parser
+            )
+            for site in range(self.sites)
+        ]
+
+    @property
+    def total_articles(self) -> int:
+        return self.sites * self.pages * self.entries * self.articles
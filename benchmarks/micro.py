@@ -0,0 +1,95 @@
+import random
+import timeit
+
+from typing import Callable, Dict, List, Tuple
+from evenflow.scrapers.feed.site_feed import UrlExtractor
+from evenflow.streams.consumers.dispatcher import newspaper_config
+from evenflow.streams.messages import ArticleExtended, DataKeeper
+from evenflow.urlman import LabelledSources
+from evenflow.utreq import PARSERS, make_document
+
+from .corpus import SyntheticSite
+
+BASE = "http://127.0.0.2:8080"
+Result = Tuple[str, float, float]
+
+
+def measure(name: str, call: Callable[[], object], number: int, repeat: int = 3) -> Result:
+    """best of `repeat` runs, as seconds per call and calls per second"""
+    best = min(timeit.repeat(call, number=number, repeat=repeat)) / number
+    return name, best, 1 / best
+
+
+def bench_article(site: SyntheticSite, number: int) -> List[Result]:
+    html, conf = site.article(0, 0, 0, 0), newspaper_config()
+
+    def parse(nlp: bool) -> Callable[[], object]:
+        return lambda: ArticleExtended(html, BASE, BASE, False, conf, do_nlp=nlp)
+
+    return [
+        measure("article.parse", parse(False), number),
+        measure("article.parse+nlp", parse(True), number)
+    ]
+
+
+def bench_extractor(site: SyntheticSite, number: int) -> List[Result]:
+    listing, entry = site.listing(BASE, 0, 0), site.entry(BASE, 0, 0, 0)
+    results = []
+    for parser in PARSERS:
+        results.append(measure(
+            f"feed.{parser}",
+            lambda: UrlExtractor(make_document(listing, parser)).make_feed_container("a.entry", "a.next"),
+            number
+        ))
+        results.append(measure(
+            f"links.{parser}",
+            lambda: UrlExtractor(make_document(entry, parser)).make_url_container("a.article"),
+            number
+        ))
+    return results
+
+
+def bench_sources(sources: int, lookups: int) -> List[Result]:
+    rnd = random.Random(3)
+    labelled = LabelledSources(strip_path=True)
+    domains = [f"news{i}.example{i % 97}.com" for i in range(sources)]
+    for i, domain in enumerate(domains):
+        labelled[domain] = "fake" if i % 2 else "real"
+
+    urls = [
+        f"https://{rnd.choice(['www.', 'm.', ''])}{rnd.choice(domains)}/2019/{rnd.randrange(1000)}/story"
+        for _ in range(lookups)
+    ]
+    unknown = [f"https://unknown{i}.org/story" for i in range(lookups)]
+    return [
+        measure(f"sources.hit[{sources}]", lambda: [labelled[url] for url in urls], 1),
+        measure(f"sources.miss[{sources}]", lambda: [url in labelled for url in unknown], 1)
+    ]
+
+
+def bench_merge(keepers: int, links: int) -> List[Result]:
+    def keeper(i: int) -> DataKeeper:
+        return DataKeeper(initial_links={f"{BASE}/{i}/{n}": (BASE, False) for n in range(links)})
+
+    pages = [keeper(i) for i in range(keepers)]
+
+    def merge() -> DataKeeper:
+        merged = DataKeeper()
+        for page in pages:
+            merged += page
+        return merged
+
+    return [measure(f"datakeeper.merge[{keepers}x{links}]", merge, 1)]
+
+
+def run_micro(site: SyntheticSite, number: int = 20, sources: int = 50000) -> List[Result]:
+    return (
+        bench_article(site, number) +
+        bench_extractor(site, number) +
+        bench_sources(sources, 10000) +
+        bench_merge(1000, 50)
+    )
+
+
+def to_dict(results: List[Result]) -> Dict[str, Dict[str, float]]:
+    return {name: {"seconds": seconds, "per_second": rate} for name, seconds, rate in results}
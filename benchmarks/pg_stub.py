@@ -0,0 +1,109 @@
+import asyncio
+
+from typing import List, Dict, Tuple, Iterable, Any
+from evenflow.streams.messages.article_record import COLUMNS
+
+
+class StubDatabase:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.articles: Dict[str, Tuple] = {}
+        self.errors: List[Tuple] = []
+        self.calls = 0
+
+
+class StubTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class StubStatement:
+    def __init__(self, conn: 'StubConnection'):
+        self.conn = conn
+
+    async def fetchval(self, *args) -> Any:
+        return await self.conn.insert_article(args)
+
+
+class StubConnection:
+    """
+    the subset of asyncpg.Connection used by the pg consumers; articles are deduplicated by url
+    so that merges return only new rows, everything else is accepted and dropped
+    """
+
+    def __init__(self, db: StubDatabase):
+        self.db = db
+        self.__staging: List[Tuple] = []
+        self.__columns: List[str] = []
+
+    async def __call(self):
+        self.db.calls += 1
+        if self.db.latency > 0:
+            await asyncio.sleep(self.db.latency)
+
+    def transaction(self) -> StubTransaction:
+        return StubTransaction()
+
+    async def execute(self, query: str, *args) -> str:
+        await self.__call()
+        return "OK"
+
+    async def executemany(self, query: str, rows: Iterable[Tuple]):
+        await self.__call()
+        self.db.errors.extend(rows)
+
+    async def copy_records_to_table(self, table: str, records: Iterable[Tuple], columns: List[str]):
+        await self.__call()
+        self.__staging, self.__columns = list(records), list(columns)
+
+    async def fetch(self, query: str, *args) -> List[Dict]:
+        await self.__call()
+        stored = []
+        url = self.__columns.index("url")
+        for row in self.__staging:
+            if row[url] not in self.db.articles:
+                self.db.articles[row[url]] = row
+                stored.append({"url": row[url]})
+        self.__staging = []
+        return stored
+
+    async def prepare(self, query: str) -> StubStatement:
+        await self.__call()
+        return StubStatement(self)
+
+    async def insert_article(self, row: Tuple) -> Any:
+        await self.__call()
+        url = row[COLUMNS.index('url')]
+        if url in self.db.articles:
+            raise ValueError(f"{url} already stored")
+        self.db.articles[url] = row
+        return url
+
+
+class StubAcquire:
+    def __init__(self, db: StubDatabase):
+        self.db = db
+
+    async def __aenter__(self) -> StubConnection:
+        return StubConnection(self.db)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class StubPool:
+    def __init__(self, latency: float = 0.0):
+        self.db = StubDatabase(latency)
+
+    def acquire(self) -> StubAcquire:
+        return StubAcquire(self.db)
+
+    async def close(self):
+        pass
+
+    @property
+    def articles(self) -> int:
+        return len(self.db.articles)
@@ -0,0 +1,119 @@
+import asyncio
+import resource
+import time
+
+from typing import Dict, List, Optional
+from aiohttp import ClientSession
+from evenflow import metrics
+from evenflow.bootstrap import BootstrapScraper
+from evenflow.loop_monitor import LoopMonitor, LOOP_LAG
+from evenflow.streams import consumers, producers
+
+from .corpus import SyntheticSite
+from .pg_stub import StubPool
+from .server import Faults, LocalServer, make_app
+
+BENCH_HOSTS = {
+    "rate": 200,
+    "burst": 200,
+    "initial_concurrency": 8,
+    "max_concurrency": 32
+}
+
+
+class BenchScraper(BootstrapScraper):
+    """the scraper bootstrap with the html producer only"""
+
+    def create_producers(self):
+        return [
+            producers.collect_links_html(send_channel=self.q["sources"], to_scrape=self.feeds, session=self.ssn)
+        ]
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    # ru_maxrss is in kilobytes on linux
+    return {
+        who: resource.getrusage(flag).ru_maxrss / 1024
+        for who, flag in [("self", resource.RUSAGE_SELF), ("children", resource.RUSAGE_CHILDREN)]
+    }
+
+
+def total(snapshot: Dict, family: str, **labels) -> float:
+    def matches(key: str) -> bool:
+        return all(f'{name}="{value}"' in key for name, value in labels.items())
+    return sum(value for key, value in snapshot.get(family, {}).items() if matches(key))
+
+
+async def make_pool(dsn: Optional[str], db_latency: float):
+    if dsn is None:
+        return StubPool(db_latency)
+    import asyncpg
+    return await asyncpg.create_pool(dsn)
+
+
+async def run_pipeline(
+        loop: asyncio.events,
+        site: SyntheticSite,
+        faults: Faults,
+        parse_workers: Optional[int] = None,
+        dsn: Optional[str] = None,
+        db_latency: float = 0.0,
+        hosts: Optional[Dict] = None
+) -> Dict:
+    server = LocalServer(make_app(site, faults), site.sites)
+    bases = await server.start()
+    pool = await make_pool(dsn, db_latency)
+    monitor = LoopMonitor(loop)
+
+    async with ClientSession(loop=loop) as session:
+        bootstrap = BenchScraper(
+            loop=loop,
+            rules=consumers.ArticleRules(lambda url, fake, archived: True),
+            dispatcher_options={"parse_workers": parse_workers, "hosts": hosts if hosts is not None else BENCH_HOSTS},
+            duplicates=consumers.DuplicateChecker(),
+            queue_options=None,
+            backup_path=None,
+            initial_state=None,
+            feeds=site.feeds(bases),
+            reddit_settings=None,
+            session=session
+        )
+        tasks: List = bootstrap.create_tasks(pool) + [monitor.run()]
+        jobs = [asyncio.ensure_future(task, loop=loop) for task in tasks]
+
+        start = time.perf_counter()
+        for producer in bootstrap.create_producers():
+            await producer
+        for queue in bootstrap.q.values():
+            await queue.join()
+        elapsed = time.perf_counter() - start
+
+        for job in jobs:
+            job.cancel()
+
+    await pool.close()
+    await server.close()
+    return summarise(elapsed, site, monitor)
+
+
+def summarise(elapsed: float, site: SyntheticSite, monitor: LoopMonitor) -> Dict:
+    snapshot = metrics.registry.snapshot()
+    pages = total(snapshot, "evenflow_fetches")
+    stored = total(snapshot, "evenflow_rows", table="article", outcome="stored")
+    return {
+        "elapsed_seconds": elapsed,
+        "pages": pages,
+        "pages_per_second": pages / elapsed,
+        "articles_expected": site.total_articles,
+        "articles_stored": stored,
+        "articles_per_second": stored / elapsed,
+        "loop_lag_seconds": {f"p{int(q * 100)}": LOOP_LAG.quantile(q) for q in (0.5, 0.99)},
+        "loop_blocked_seconds": dict(monitor.blocked),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {
+            name + ("" if labels == "{}" else labels): {key: values[key] for key in ("p50", "p99", "count")}
+            for name, children in snapshot.items()
+            for labels, values in children.items()
+            if isinstance(values, dict) and values.get("count", 0) > 0
+        }
+    }
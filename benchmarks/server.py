@@ -0,0 +1,96 @@
+import asyncio
+import random
+import socket
+
+from typing import Optional, List
+from aiohttp import web
+
+from .corpus import SyntheticSite
+
+TIMEOUT_SLEEP = 120.0
+
+
+class Faults:
+    """latency and errors injected into every response"""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, timeout_rate: float = 0.0, seed: int = 7):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.random = random.Random(seed)
+
+    async def apply(self) -> Optional[web.Response]:
+        if self.latency > 0:
+            await asyncio.sleep(self.random.uniform(0, 2 * self.latency))
+        roll = self.random.random()
+        if roll < self.timeout_rate:
+            await asyncio.sleep(TIMEOUT_SLEEP)
+        if roll < self.timeout_rate + self.error_rate:
+            return web.Response(status=503, text="try again later")
+        return None
+
+
+def make_app(site: SyntheticSite, faults: Optional[Faults] = None) -> web.Application:
+    faults = faults if faults is not None else Faults()
+
+    @web.middleware
+    async def inject(request: web.Request, handler):
+        failure = await faults.apply()
+        return failure if failure is not None else await handler(request)
+
+    def html(text: str) -> web.Response:
+        return web.Response(text=text, content_type="text/html", charset="utf-8")
+
+    def site_of(request: web.Request) -> int:
+        return int(request.match_info["site"][len("site"):])
+
+    def base(request: web.Request) -> str:
+        return f"{request.scheme}://{request.host}"
+
+    def ints(request: web.Request, *keys: str):
+        return [int(request.match_info[key]) for key in keys]
+
+    async def listing(request: web.Request) -> web.Response:
+        return html(site.listing(base(request), site_of(request), *ints(request, "page")))
+
+    async def entry(request: web.Request) -> web.Response:
+        return html(site.entry(base(request), site_of(request), *ints(request, "page", "entry")))
+
+    async def article(request: web.Request) -> web.Response:
+        return html(site.article(site_of(request), *ints(request, "page", "entry", "n")))
+
+    app = web.Application(middlewares=[inject])
+    app.router.add_get("/{site}/list/{page}", listing)
+    app.router.add_get("/{site}/entry/{page}/{entry}", entry)
+    app.router.add_get("/{site}/article/{page}/{entry}/{n}", article)
+    return app
+
+
+class LocalServer:
+    """
+    serves the app on one loopback address per site: the scheduler keys its limits on the host name,
+    so sharing a single address would measure the per-host throttle instead of the pipeline
+    """
+
+    def __init__(self, app: web.Application, sites: int, port: int = 0):
+        self.app = app
+        self.sites = sites
+        self.port = port
+        self.bases: List[str] = []
+        self.__runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> List[str]:
+        self.__runner = web.AppRunner(self.app)
+        await self.__runner.setup()
+        for site in range(self.sites):
+            address = f"127.0.0.{site + 2}"
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((address, self.port))
+            await web.SockSite(self.__runner, sock).start()
+            self.bases.append(f"http://{address}:{sock.getsockname()[1]}")
+        return self.bases
+
+    async def close(self):
+        if self.__runner is not None:
+            await self.__runner.cleanup()
@@ -1,43 +1,64 @@
 import asyncio
+import logging
+import multiprocessing
+import sys
 import time
-import traceback
 import uvloop
 import abc
 
 from asyncpg.pool import Pool
-from typing import List, Dict, Awaitable
+from typing import List, Dict, Awaitable, Optional
 from functools import partial
 from aiohttp import ClientSession
 from dirtyfunc import Either, Left, Right
-from evenflow import Conf
+from evenflow import Conf, metrics
+from evenflow.logs import setup_logging
+from evenflow.loop_monitor import make_monitor
 from evenflow.dbops import DatabaseCredentials
 from evenflow.data_manager import DataManager
-from evenflow.streams import consumers, producers
+from evenflow.streams import consumers, producers, queues
 from evenflow.scrapers.feed import FeedScraper
+from evenflow.shards import Shard
+from evenflow.utreq import HttpCache
+
+logger = logging.getLogger(__name__)
 
 S, A, E, D = "sources", "articles", "errors", "delete"
+QUEUE_REPORT_EVERY = 30.0
+SNAPSHOT_EVERY = 30.0
 
 
 class Bootstrap(abc.ABC):
-    def __init__(self, loop: asyncio.events, rules: consumers.ArticleRules):
+    def __init__(
+            self,
+            loop: asyncio.events,
+            rules: consumers.ArticleRules,
+            dispatcher_options: Dict,
+            duplicates: consumers.DuplicateChecker,
+            queue_options: Optional[Dict] = None
+    ):
         self.loop = loop
-        self.q = self.__create_queues()
-        self.dispatcher_settings = self.__create_dispatcher(rules)
-
-    def __create_queues(self) -> Dict[str, asyncio.Queue]:
-        return {name: asyncio.Queue(loop=self.loop) for name in [S, A, E]}
+        self.q = queues.make_queues(loop, queue_options)
+        self.duplicates = duplicates
+        self.dispatcher_settings = self.__create_dispatcher(rules, dispatcher_options)
 
-    def __create_dispatcher(self, rules: consumers.ArticleRules):
-        return partial(consumers.DefaultDispatcher, loop=self.loop, rules=rules)
+    def __create_dispatcher(self, rules: consumers.ArticleRules, options: Dict):
+        return partial(consumers.DefaultDispatcher, loop=self.loop, rules=rules, duplicates=self.duplicates, **options)
 
     def create_tasks(self, pool: Pool) -> List[Awaitable]:
         dispatcher_queues = consumers.DispatcherQueues(links=self.q[S], storage=self.q[A], error=self.q[E])
         return [
             consumers.dispatch_links(conf=self.dispatcher_settings(), queues=dispatcher_queues),
             consumers.store_articles(
-                pool=pool, storage_queue=self.q[A], error_queue=self.q[E], delete_queue=self.q.get(D)
+                pool=pool,
+                storage_queue=self.q[A],
+                error_queue=self.q[E],
+                delete_queue=self.q[D],
+                duplicates=self.duplicates
             ),
-            consumers.store_errors(pool=pool, error_queue=self.q[E])
+            consumers.store_errors(pool=pool, error_queue=self.q[E]),
+            consumers.delete_errors(pool=pool, delete=self.q[D]),
+            queues.report_every(self.q, QUEUE_REPORT_EVERY)
         ]
 
     @abc.abstractmethod
@@ -51,13 +72,23 @@ class BootstrapScraper(Bootstrap):
             self,
             loop: asyncio.events,
             rules: consumers.ArticleRules,
+            dispatcher_options: Dict,
+            duplicates: consumers.DuplicateChecker,
+            queue_options: Optional[Dict],
             backup_path: str,
             initial_state: Dict,
             feeds: List[FeedScraper],
             reddit_settings: producers.RedditSettings,
-            session: ClientSession
+            session: ClientSession,
+            http_cache: Optional[HttpCache] = None
     ):
-        super().__init__(loop=loop, rules=rules)
+        super().__init__(
+            loop=loop,
+            rules=rules,
+            dispatcher_options=dispatcher_options,
+            duplicates=duplicates,
+            queue_options=queue_options
+        )
         self.dispatcher_settings = partial(
             self.dispatcher_settings,
             backup_path=backup_path,
@@ -67,30 +98,40 @@ class BootstrapScraper(Bootstrap):
         self.feeds = feeds
         self.rsm = reddit_settings
         self.ssn = session
+        self.http_cache = http_cache
 
     def create_producers(self) -> List[Awaitable]:
         return [
-            producers.collect_links_html(send_channel=self.q[S], to_scrape=self.feeds, session=self.ssn),
-            producers.collect_links_reddit(send_channel=self.q[S], rsm=self.rsm)
+            producers.collect_links_html(
+                send_channel=self.q[S],
+                to_scrape=self.feeds,
+                session=self.ssn,
+                cache=self.http_cache
+            ),
+            producers.collect_links_reddit(send_channel=self.q[S], rsm=self.rsm, loop=self.loop)
         ]
 
 
 class BootstrapRestorer(Bootstrap):
 
-    def __init__(self, loop: asyncio.events, rules: consumers.ArticleRules, db_cred: DatabaseCredentials):
-        super().__init__(loop, rules)
-        self.q[D] = asyncio.Queue(loop=loop)
+    def __init__(
+            self,
+            loop: asyncio.events,
+            rules: consumers.ArticleRules,
+            dispatcher_options: Dict,
+            duplicates: consumers.DuplicateChecker,
+            queue_options: Optional[Dict],
+            db_cred: DatabaseCredentials,
+            shard: Optional[Shard] = None
+    ):
+        super().__init__(loop, rules, dispatcher_options, duplicates, queue_options)
         self.db_cred = db_cred
+        self.shard = shard
         self.dispatcher_settings = partial(self.dispatcher_settings, timeout=189)
 
-    def create_tasks(self, pool: Pool) -> List[Awaitable]:
-        to_ret = super().create_tasks(pool)
-        to_ret.append(consumers.delete_errors(pool=pool, delete=self.q[D]))
-        return to_ret
-
     def create_producers(self) -> List[Awaitable]:
         return [
-            producers.restore_errors(send_channel=self.q[S], db_cred=self.db_cred, fake=label)
+            producers.restore_errors(send_channel=self.q[S], db_cred=self.db_cred, fake=label, shard=self.shard)
             for label in [True, False]
         ]
 
@@ -99,6 +140,7 @@ def bootstrapper(
         conf: Conf,
         loop: asyncio.events,
         rules: consumers.ArticleRules,
+        duplicates: consumers.DuplicateChecker,
         session: ClientSession
 ) -> Either[Exception, Bootstrap]:
 
@@ -107,33 +149,64 @@ def bootstrapper(
         return Left[Exception](ValueError("no sources to begin with"))
 
     if conf.restore:
-        return Right[Bootstrap](BootstrapRestorer(loop=loop, db_cred=conf.setupdb(), rules=rules))
+        return Right[Bootstrap](
+            BootstrapRestorer(
+                loop=loop,
+                db_cred=conf.setupdb(),
+                rules=rules,
+                dispatcher_options=conf.dispatcher,
+                duplicates=duplicates,
+                queue_options=conf.queues,
+                shard=conf.shard
+            )
+        )
 
     return Right[Bootstrap](
         BootstrapScraper(
             loop=loop,
             rules=rules,
+            dispatcher_options=conf.dispatcher,
+            duplicates=duplicates,
+            queue_options=conf.queues,
             feeds=maybe_feeds.on_right(),
             reddit_settings=maybe_rs.on_right(),
             backup_path=conf.backup_file_path,
             initial_state=conf.initial_state,
-            session=session
+            session=session,
+            http_cache=conf.make_http_cache()
         )
     )
 
 
+async def migrate(data_manager: DataManager):
+    if await data_manager.migrate():
+        logger.info("error table migrated to unique urls")
+
+
 async def asy_main(loop: asyncio.events, conf: Conf) -> float:
     data_manager = DataManager(db_credentials=conf.setupdb())
+    # sharded workers find the schema already migrated by the parent process
+    if conf.shard is None:
+        await migrate(data_manager)
     article_rules = conf.load_rules_into(await data_manager.article_rules)
+    duplicates = await data_manager.duplicate_checker(conf.seen_snapshot)
 
     async with ClientSession(loop=loop) as session:
-        maybe_start = bootstrapper(conf, loop, rules=article_rules, session=session)
+        maybe_start = bootstrapper(conf, loop, rules=article_rules, duplicates=duplicates, session=session)
         if maybe_start.empty:
-            print(maybe_start.on_left())
+            logger.error("%s", maybe_start.on_left())
             return 0.0
 
         bootstrap: Bootstrap = maybe_start.on_right()
-        jobs = [asyncio.ensure_future(task, loop=loop) for task in bootstrap.create_tasks(await data_manager.pool)]
+        tasks = bootstrap.create_tasks(await data_manager.pool)
+        prometheus_port, snapshot = conf.metrics.get("prometheus_port"), conf.metrics.get("snapshot")
+        exporter = await metrics.serve_prometheus(prometheus_port) if prometheus_port is not None else None
+        if snapshot is not None:
+            tasks.append(metrics.write_snapshots(snapshot, conf.metrics.get("every", SNAPSHOT_EVERY)))
+        monitor = make_monitor(loop, conf.loop_monitor)
+        if monitor is not None:
+            tasks.append(monitor.run())
+        jobs = [asyncio.ensure_future(task, loop=loop) for task in tasks]
 
         start_time = time.perf_counter()
         for producer in bootstrap.create_producers():
@@ -147,22 +220,64 @@ async def asy_main(loop: asyncio.events, conf: Conf) -> float:
         for job in jobs:
             job.cancel()
 
-        print("delete duplicate errors")
-        await data_manager.delete_errors()
+        logger.info("queues: %s", queues.report(bootstrap.q))
+        if monitor is not None:
+            logger.info("%s", monitor.report())
+        metrics.registry.gauge("evenflow_scrape_seconds", "time the producers took").set(scrape_time)
+        if snapshot is not None:
+            metrics.write_snapshot(snapshot)
+        if exporter is not None:
+            await exporter.cleanup()
+
+        if conf.seen_snapshot is not None:
+            duplicates.dump(conf.seen_snapshot)
+
         await data_manager.close_pool()
-        print("pool closed")
+        logger.info("pool closed")
 
         return scrape_time
 
 
 def run(c: Conf):
+    setup_logging(c.log_level, name=str(c.shard) if c.shard is not None else None)
+    if c.workers > 1 and c.shard is None:
+        run_sharded(c)
+        return
+
     asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     event_loop = asyncio.get_event_loop()
     try:
         exec_time = event_loop.run_until_complete(asy_main(loop=event_loop, conf=c))
-        print(f"job executed in {exec_time:0.2f} seconds.")
+        logger.info("job executed in %0.2f seconds.", exec_time)
     except Exception as err:
-        print(f'asy_main {err}')
-        print(traceback.format_exc())
+        logger.exception("asy_main %s", err)
+        if c.shard is not None:
+            # the parent only learns that a worker failed from its exit code
+            sys.exit(1)
     finally:
         event_loop.close()
+
+
+def run_sharded(c: Conf):
+    """runs one process per shard, each with its own loop, pools and share of the sources"""
+    start_time = time.perf_counter()
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(migrate(DataManager(db_credentials=c.setupdb())))
+    finally:
+        loop.close()
+
+    workers = [
+        multiprocessing.Process(target=run, args=(c.for_shard(index),), name=f"evenflow-{index}")
+        for index in range(c.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    failed = [worker.name for worker in workers if worker.exitcode != 0]
+    logger.info("%d workers executed in %0.2f seconds.", len(workers), time.perf_counter() - start_time)
+    if len(failed) > 0:
+        logger.error("workers failed: %s", ', '.join(failed))
+        sys.exit(1)
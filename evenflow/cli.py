@@ -1,6 +1,8 @@
 import argparse
 
+from typing import Optional, Dict
 from evenflow import short_description, Conf
+from evenflow.loop_monitor import THRESHOLD
 from evenflow.bootstrap import run
 
 
@@ -10,12 +12,29 @@ def read_cli_args() -> argparse.Namespace:
     parser.add_argument(
         '-r', '--restore', help="restore errors stored in database", action='store_true', required=False
     )
+    parser.add_argument(
+        '-m', '--monitor-loop', help="report event loop stalls longer than SECONDS (default 0.25)",
+        nargs='?', const=THRESHOLD, type=float, metavar='SECONDS', required=False
+    )
+    parser.add_argument(
+        '-p', '--profile-stalls', help="sample the stack while the loop is stalled", action='store_true', required=False
+    )
+    parser.add_argument(
+        '-w', '--workers', help="split the sources between N processes", type=int, metavar='N', required=False
+    )
     return parser.parse_args()
 
 
+def loop_monitor_options(cli: argparse.Namespace) -> Optional[Dict]:
+    if cli.monitor_loop is None and not cli.profile_stalls:
+        return None
+    threshold = cli.monitor_loop if cli.monitor_loop is not None else THRESHOLD
+    return {"threshold": threshold, "profile": cli.profile_stalls}
+
+
 def conf_from_cli() -> Conf:
     cli = read_cli_args()
-    return Conf(cli.conf, cli.restore)
+    return Conf(cli.conf, cli.restore, loop_monitor_options(cli), cli.workers)
 
 
 if __name__ == '__main__':
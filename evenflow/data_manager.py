@@ -1,11 +1,18 @@
+import logging
+import os
+
+from array import array
 from functools import partial
 from typing import Optional
 
+from asyncpg.connection import Connection
 from asyncpg.pool import Pool
 
-from evenflow.dbops import DatabaseCredentials, queries
+from evenflow.dbops import DatabaseCredentials, queries, migrate
 from evenflow.streams import consumers
-from evenflow.urlman import LabelledSources
+from evenflow.urlman import LabelledSources, SeenIndex
+
+logger = logging.getLogger(__name__)
 
 HIGH, LOW, MIXED, ARCHIVE = "high", "low", "mixed", "archive"
 
@@ -45,10 +52,27 @@ class DataManager:
 
         return labelled_sources.strip(True)
 
+    async def duplicate_checker(self, snapshot: Optional[str] = None) -> consumers.DuplicateChecker:
+        if snapshot is not None and os.path.exists(snapshot):
+            return consumers.DuplicateChecker.load(snapshot)
+        return await self.db_credentials.do_with_connection(lambda conn: self.__seen_articles(conn))
+
+    @staticmethod
+    async def __seen_articles(conn: Connection) -> consumers.DuplicateChecker:
+        urls, titles = array('Q'), array('Q')
+        async with conn.transaction():
+            async for record in queries.select_seen(conn):
+                for url in [record["url"], record["visited_url"]]:
+                    if url is not None:
+                        urls.append(SeenIndex.key(url))
+                if record["title"] is not None:
+                    titles.append(SeenIndex.key(record["title"]))
+        return consumers.DuplicateChecker(urls=SeenIndex(urls), titles=SeenIndex(titles))
+
     @property
     async def pool(self) -> Pool:
         if self.__pool is None:
-            print("about to create pool")
+            logger.info("about to create pool")
             self.__pool = await self.db_credentials.make_pool()
         return self.__pool
 
@@ -56,8 +80,8 @@ class DataManager:
         if self.__pool is not None:
             await self.__pool.close()
 
-    async def delete_errors(self):
-        await self.db_credentials.do_with_connection(lambda conn: queries.delete_errors(conn))
+    async def migrate(self) -> bool:
+        return await self.db_credentials.do_with_connection(lambda conn: migrate(conn))
 
     @staticmethod
     def add_url(labelled_sources: LabelledSources, url: str, from_fake: bool, from_archive: bool) -> bool:
@@ -1,3 +1,4 @@
-from .credentials import DatabaseCredentials
+from .credentials import DatabaseCredentials, POOL_SIZE
 from .query_builder import QueryManager
-from .queries import select_errors, select_sources, delete_errors
+from .queries import select_errors, select_sources, select_seen, copy_merge, delete_errors_by_url, prune_stored_errors
+from .migrations import migrate
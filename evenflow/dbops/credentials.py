@@ -1,11 +1,16 @@
 import asyncpg
+
+from functools import partial
 from typing import Optional, Callable, TypeVar, Awaitable
 
+POOL_SIZE = 10
+
 
 class DatabaseCredentials:
     T = TypeVar('T')
 
-    def __init__(self, user, host, password, name):
+    def __init__(self, user, host, password, name, pool_size: int = POOL_SIZE):
+        self.pool_size = pool_size
         self.credentials = {
             "database": name,
             "host": host,
@@ -14,7 +19,7 @@ class DatabaseCredentials:
         }
 
     async def make_pool(self) -> Optional[asyncpg.pool.Pool]:
-        return await self.__args_with(asyncpg.create_pool)
+        return await self.__args_with(partial(asyncpg.create_pool, min_size=self.pool_size, max_size=self.pool_size))
 
     async def connection(self) -> Optional[asyncpg.connection.Connection]:
         return await self.__args_with(asyncpg.connect)
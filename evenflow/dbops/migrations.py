@@ -0,0 +1,47 @@
+from asyncpg.connection import Connection
+
+ERROR_URL_INDEX = "error_url_key"
+VISITED_URL_INDEX = "article_visited_url_idx"
+
+KEEP_NEWEST_ERROR = """
+    DELETE
+        FROM error a
+        USING error b
+    WHERE a.url = b.url
+    AND (a.creation_date, a.ctid) < (b.creation_date, b.ctid);
+"""
+
+PRUNE_STORED_URLS = """
+    DELETE
+        FROM error e
+        USING article a
+    WHERE e.url = a.url;
+"""
+
+PRUNE_VISITED_URLS = """
+    DELETE
+        FROM error e
+        USING article a
+    WHERE e.url = a.visited_url;
+"""
+
+CREATE_ERROR_URL_INDEX = f"CREATE UNIQUE INDEX IF NOT EXISTS {ERROR_URL_INDEX} ON error (url);"
+
+CREATE_VISITED_URL_INDEX = f"CREATE INDEX IF NOT EXISTS {VISITED_URL_INDEX} ON article (visited_url);"
+
+
+async def migrate(conn: Connection) -> bool:
+    if await conn.fetchval("SELECT to_regclass($1::text)", ERROR_URL_INDEX) is not None:
+        return False
+
+    async with conn.transaction():
+        for statement in [
+            KEEP_NEWEST_ERROR,
+            PRUNE_STORED_URLS,
+            PRUNE_VISITED_URLS,
+            CREATE_ERROR_URL_INDEX,
+            CREATE_VISITED_URL_INDEX
+        ]:
+            await conn.execute(statement)
+
+    return True
@@ -1,7 +1,9 @@
 from asyncpg.connection import Connection
 from asyncpg import Record
 
-from typing import List
+from typing import List, Iterable, Tuple
+
+from .query_builder import QueryManager
 
 
 async def select_sources(conn: Connection) -> List[Record]:
@@ -17,19 +19,25 @@ async def select_errors(conn: Connection, fake: bool) -> List[Record]:
     )
 
 
-async def delete_errors(conn: Connection):
-    dupl = await conn.fetch("""
-        DELETE 
-            FROM error a 
-            USING error b
-        WHERE a.creation_date < b.creation_date
-        AND a.url = b.url;
-    """)
-    res = await conn.fetch("""
-        DELETE 
-            FROM error e 
-            USING article a
-        WHERE e.url = a.url
-        OR e.url = a.visited_url;
-        """)
-    return dupl, res
+def select_seen(conn: Connection, prefetch: int = 10000):
+    return conn.cursor("SELECT url, visited_url, title FROM article;", prefetch=prefetch)
+
+
+async def delete_errors_by_url(conn: Connection, urls: List[str]) -> str:
+    return await conn.execute("DELETE FROM error WHERE url = ANY($1::text[])", urls)
+
+
+async def prune_stored_errors(conn: Connection, urls: List[str]):
+    for column in ["url", "visited_url"]:
+        await conn.execute(
+            f"DELETE FROM error e USING article a WHERE e.url = ANY($1::text[]) AND e.url = a.{column}",
+            urls
+        )
+
+
+async def copy_merge(conn: Connection, query_manager: QueryManager, rows: Iterable[Tuple], returning: str) -> List:
+    async with conn.transaction():
+        await conn.execute(query_manager.make_staging())
+        await conn.copy_records_to_table(query_manager.staging, records=rows, columns=query_manager.columns)
+        records = await conn.fetch(f"{query_manager.make_merge()} RETURNING {returning}")
+    return [record[returning] for record in records]
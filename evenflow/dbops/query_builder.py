@@ -11,9 +11,27 @@ class QueryManager:
         placeholders = ['${}'.format(i) for i, _ in enumerate(self.columns, 1)]
         return insert_stub.format(self.table, self.__join(self.columns), self.__join(placeholders))
 
+    def make_upsert(self, key: str, newer: str) -> str:
+        upsert_stub = '{} ON CONFLICT ({}) DO UPDATE SET {} WHERE {}.{} < EXCLUDED.{}'
+        updates = ['{} = EXCLUDED.{}'.format(col, col) for col in self.columns if col != key]
+        return upsert_stub.format(self.make_insert(), key, self.__join(updates), self.table, newer, newer)
+
+    def make_staging(self) -> str:
+        staging_stub = 'CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP'
+        return staging_stub.format(self.staging, self.table)
+
+    def make_merge(self) -> str:
+        merge_stub = 'INSERT INTO {} ({}) SELECT {} FROM {} ON CONFLICT DO NOTHING'
+        columns = self.__join(self.columns)
+        return merge_stub.format(self.table, columns, columns, self.staging)
+
     def sort_args(self, args: Dict[str, str]):
         return [args[col] for col in self.columns]
 
+    @property
+    def staging(self) -> str:
+        return '{}_staging'.format(self.table)
+
     @staticmethod
     def __join(elements: List[str]):
         return ', '.join(elements)
@@ -0,0 +1,50 @@
+import logging
+import time
+
+from typing import Dict, Tuple, Optional
+
+FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class RateLimitFilter(logging.Filter):
+    """lets through at most `burst` records per message template every `period` seconds"""
+
+    def __init__(self, burst: int = 10, period: float = 10.0):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self.__windows: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self.__swept = time.monotonic()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        if now - self.__swept >= self.period:
+            self.__sweep(now)
+        start, seen = self.__windows.get(key, (now, 0))
+
+        if now - start >= self.period:
+            if seen > self.burst:
+                record.msg = f"{record.msg} [{seen - self.burst} similar messages suppressed]"
+            start, seen = now, 0
+
+        self.__windows[key] = (start, seen + 1)
+        return seen < self.burst
+
+    def __sweep(self, now: float):
+        # a template that stopped coming would otherwise hold its window forever
+        self.__windows = {key: w for key, w in self.__windows.items() if now - w[0] < self.period}
+        self.__swept = now
+
+    def __len__(self) -> int:
+        return len(self.__windows)
+
+
+def setup_logging(level: str = "INFO", burst: int = 10, period: float = 10.0, name: Optional[str] = None):
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(FORMAT if name is None else f"[{name}] {FORMAT}"))
+    handler.addFilter(RateLimitFilter(burst, period))
+    root = logging.getLogger("evenflow")
+    root.setLevel(level)
+    root.handlers = [handler]
+    root.propagate = False
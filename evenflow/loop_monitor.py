@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from collections import Counter
+from typing import Optional, List, Dict
+from evenflow.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+INTERVAL = 0.1
+THRESHOLD = 0.25
+PROFILE_EVERY = 0.01
+TOP_FRAMES = 8
+
+LOOP_LAG = registry.histogram("evenflow_loop_lag_seconds", "how late the event loop wakes a sleeping task")
+
+
+def current_task(loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Task]:
+    if hasattr(asyncio, 'current_task'):
+        return asyncio.current_task(loop)
+    return asyncio.Task.current_task(loop)
+
+
+def task_name(task: Optional[asyncio.Task]) -> str:
+    if task is None:
+        return "<callback>"
+    coro = getattr(task, '_coro', None)
+    return getattr(coro, '__qualname__', repr(coro))
+
+
+def frame_key(frame: traceback.FrameSummary) -> str:
+    return f"{frame.filename}:{frame.lineno} {frame.name}"
+
+
+class Stall:
+    """a span of time during which the loop did not come back to the sampler"""
+
+    def __init__(self, since: float):
+        self.since = since
+        self.until = since
+        self.tasks: Counter = Counter()
+        self.frames: Counter = Counter()
+        self.samples = 0
+        self.stack: List[str] = []
+
+    def sample(self, task: str, frame, now: float, profile: bool):
+        self.until = now
+        self.tasks[task] += 1
+        if len(self.stack) > 0 and not profile:
+            return
+
+        stack = traceback.extract_stack(frame) if frame is not None else []
+        if len(self.stack) == 0:
+            self.stack = [frame_key(f) for f in stack[-TOP_FRAMES:]]
+        if profile and len(stack) > 0:
+            self.samples += 1
+            # self time: only the innermost frame of each sample is charged
+            self.frames[frame_key(stack[-1])] += 1
+
+    @property
+    def duration(self) -> float:
+        return self.until - self.since
+
+    @property
+    def task(self) -> str:
+        return self.tasks.most_common(1)[0][0] if len(self.tasks) > 0 else "<unknown>"
+
+    def hottest(self, n: int = TOP_FRAMES) -> List[str]:
+        return [f"{100 * hits / self.samples:.0f}% {key}" for key, hits in self.frames.most_common(n)]
+
+
+class LoopMonitor:
+    """
+    measures event loop lag from inside the loop and watches for stalls from a separate thread:
+    when the sampler has not run for `threshold` seconds the watchdog looks at the loop thread's stack
+    and at the task the loop is running, and optionally keeps sampling the stack until the loop recovers
+    """
+
+    def __init__(
+            self,
+            loop: asyncio.AbstractEventLoop,
+            interval: float = INTERVAL,
+            threshold: float = THRESHOLD,
+            profile: bool = False,
+            profile_every: float = PROFILE_EVERY
+    ):
+        self.loop = loop
+        self.interval = interval
+        self.threshold = max(threshold, 2 * interval)
+        self.profile = profile
+        self.profile_every = profile_every
+        self.blocked: Counter = Counter()
+        self.stalls: Counter = Counter()
+        self.__beat = time.monotonic()
+        self.__loop_thread: Optional[int] = None
+        self.__stop = threading.Event()
+        self.__watchdog: Optional[threading.Thread] = None
+
+    async def run(self):
+        self.__loop_thread = threading.get_ident()
+        self.__beat = time.monotonic()
+        self.__watchdog = threading.Thread(target=self.__watch, name="evenflow-loop-watchdog", daemon=True)
+        self.__watchdog.start()
+        try:
+            while True:
+                start = time.monotonic()
+                await asyncio.sleep(self.interval)
+                self.__beat = now = time.monotonic()
+                LOOP_LAG.observe(max(0.0, now - start - self.interval))
+        finally:
+            self.__stop.set()
+
+    def __watch(self):
+        stall: Optional[Stall] = None
+        while not self.__stop.is_set():
+            now, beat = time.monotonic(), self.__beat
+            if now - beat < self.threshold:
+                if stall is not None:
+                    self.__hand_over(stall)
+                    stall = None
+                self.__stop.wait(self.interval)
+                continue
+
+            # the sampler was due back one interval after its last beat
+            due = beat + self.interval
+            if stall is None or stall.since != due:
+                if stall is not None:
+                    self.__hand_over(stall)
+                stall = Stall(due)
+            frame = sys._current_frames().get(self.__loop_thread)
+            stall.sample(task_name(current_task(self.loop)), frame, now, self.profile)
+            self.__stop.wait(self.profile_every if self.profile else self.interval)
+
+    def __hand_over(self, stall: Stall):
+        # stalls are recorded on the loop thread, which owns the metrics and the logging
+        try:
+            self.loop.call_soon_threadsafe(self.__record, stall)
+        except RuntimeError:
+            self.__stop.set()
+
+    def __record(self, stall: Stall):
+        self.blocked[stall.task] += stall.duration
+        registry.counter(
+            "evenflow_loop_blocked_seconds", "time the loop was held without yielding", task=stall.task
+        ).inc(stall.duration)
+
+        self.stalls[stall.task] += 1
+
+        logger.warning("loop blocked for %.3fs by %s at %s", stall.duration, stall.task, " <- ".join(stall.stack[::-1]))
+        if self.profile and stall.samples > 0:
+            logger.warning("hottest frames over %d samples: %s", stall.samples, "; ".join(stall.hottest()))
+
+    def report(self) -> str:
+        lag = ', '.join(f"p{int(q * 100)} {LOOP_LAG.quantile(q):.3f}s" for q in (0.5, 0.99))
+        blocked = ', '.join(
+            f"{task} {seconds:.2f}s in {self.stalls[task]} stalls" for task, seconds in self.blocked.most_common()
+        )
+        return f"loop lag {lag}, max {LOOP_LAG.max:.3f}s; blocked by: {blocked or 'nothing'}"
+
+
+def make_monitor(loop: asyncio.AbstractEventLoop, options: Optional[Dict]) -> Optional[LoopMonitor]:
+    return LoopMonitor(loop, **options) if options is not None else None
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import math
+import os
+import time
+
+from contextlib import contextmanager
+from typing import Dict, Tuple, Optional, Callable, List, Iterator, Union
+from aiohttp import web
+
+SUB_BUCKETS = 16
+QUANTILES = (0.5, 0.9, 0.99)
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def bucket_of(value: float) -> int:
+    """log-linear bucket index: 16 linear sub-buckets per power of two, each at most 1/16 of its values wide"""
+    mantissa, exponent = math.frexp(value)
+    return exponent * SUB_BUCKETS + int((mantissa - 0.5) * 2 * SUB_BUCKETS)
+
+
+def bucket_bounds(index: int) -> Tuple[float, float]:
+    exponent, sub = divmod(index, SUB_BUCKETS)
+    width = 1 / (2 * SUB_BUCKETS)
+    return math.ldexp(0.5 + sub * width, exponent), math.ldexp(0.5 + (sub + 1) * width, exponent)
+
+
+class Counter:
+    kind = "counter"
+    # the text format names a counter's family after its sample, as the reference client does
+    suffix = "_total"
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def samples(self, name: str, labels: Labels) -> Iterator[Tuple[str, Labels, float]]:
+        yield f"{name}{self.suffix}", labels, self.value
+
+    def to_json(self) -> Union[float, Dict]:
+        return self.value
+
+
+class Gauge:
+    kind = "gauge"
+    suffix = ""
+
+    def __init__(self):
+        self.__value = 0.0
+        self.__read: Optional[Callable[[], float]] = None
+
+    def set(self, value: float):
+        self.__value = value
+
+    def inc(self, amount: float = 1.0):
+        self.__value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.__value -= amount
+
+    def set_function(self, read: Callable[[], float]):
+        self.__read = read
+
+    @property
+    def value(self) -> float:
+        return self.__read() if self.__read is not None else self.__value
+
+    def samples(self, name: str, labels: Labels) -> Iterator[Tuple[str, Labels, float]]:
+        yield name, labels, self.value
+
+    def to_json(self) -> Union[float, Dict]:
+        return self.value
+
+
+class Histogram:
+    """HDR-style histogram over log-linear buckets, exported as a summary"""
+    kind = "summary"
+    suffix = ""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zeros += 1
+            return
+        index = bucket_of(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank, seen = q * self.count, self.zeros
+        if seen >= rank:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                lower, upper = bucket_bounds(index)
+                return min((lower + upper) / 2, self.max)
+        return self.max
+
+    def samples(self, name: str, labels: Labels) -> Iterator[Tuple[str, Labels, float]]:
+        for q in QUANTILES:
+            yield name, labels + (("quantile", str(q)),), self.quantile(q)
+        yield f"{name}_sum", labels, self.sum
+        yield f"{name}_count", labels, self.count
+
+    def to_json(self) -> Union[float, Dict]:
+        summary = {f"p{int(q * 100)}": self.quantile(q) for q in QUANTILES}
+        return {**summary, "max": self.max, "sum": self.sum, "count": self.count}
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class Family:
+    def __init__(self, name: str, help_text: str, factory: Callable[[], Metric]):
+        self.name = name
+        self.help = help_text
+        self.factory = factory
+        self.kind = factory.kind
+        self.exposed = name + factory.suffix
+        self.children: Dict[Labels, Metric] = {}
+
+    def child(self, labels: Dict[str, str]) -> Metric:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        metric = self.children.get(key)
+        if metric is None:
+            metric = self.children[key] = self.factory()
+        return metric
+
+
+class Registry:
+    def __init__(self):
+        self.__families: Dict[str, Family] = {}
+
+    def __get(self, name: str, help_text: str, factory: Callable[[], Metric], labels: Dict[str, str]) -> Metric:
+        family = self.__families.get(name)
+        if family is None:
+            family = self.__families[name] = Family(name, help_text, factory)
+        elif family.factory is not factory:
+            raise ValueError(f"{name} is already registered as a {family.kind}")
+        return family.child(labels)
+
+    def counter(self, name: str, help_text: str = "", **labels: str) -> Counter:
+        return self.__get(name, help_text, Counter, labels)
+
+    def gauge(self, name: str, help_text: str = "", **labels: str) -> Gauge:
+        return self.__get(name, help_text, Gauge, labels)
+
+    def histogram(self, name: str, help_text: str = "", **labels: str) -> Histogram:
+        return self.__get(name, help_text, Histogram, labels)
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+        for family in self.__families.values():
+            lines.append(f"# HELP {family.exposed} {family.help}")
+            lines.append(f"# TYPE {family.exposed} {family.kind}")
+            for labels, metric in family.children.items():
+                for name, sample_labels, value in metric.samples(family.name, labels):
+                    lines.append(f"{name}{format_labels(sample_labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        return {
+            family.name: {format_labels(labels) or "{}": metric.to_json() for labels, metric in family.children.items()}
+            for family in self.__families.values()
+        }
+
+
+def format_labels(labels: Labels) -> str:
+    if len(labels) == 0:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+registry = Registry()
+
+
+async def serve_prometheus(port: int, host: str = "0.0.0.0", source: Registry = registry) -> web.AppRunner:
+    async def handle(_: web.Request) -> web.Response:
+        return web.Response(text=source.to_prometheus(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def write_snapshot(path: str, source: Registry = registry):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"time": time.time(), "metrics": source.snapshot()}, f)
+    os.replace(tmp_path, path)
+
+
+async def write_snapshots(path: str, every: float, source: Registry = registry):
+    while True:
+        await asyncio.sleep(every)
+        write_snapshot(path, source)
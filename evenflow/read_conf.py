@@ -1,14 +1,21 @@
+import copy
 import io
 import json
 import praw
 
 from typing import List, Optional, Dict, ItemsView
 from dirtyfunc import Either, Left, Right
-from evenflow.dbops import DatabaseCredentials
+from evenflow.dbops import DatabaseCredentials, POOL_SIZE
 from evenflow.scrapers.feed import FeedScraper, SiteFeed
 from evenflow.streams.messages import CollectorState
-from evenflow.streams.consumers import ArticleRules
+from evenflow.streams.consumers import ArticleRules, TITLE, TEXT, PATH, URL, replay_journal
+from evenflow.streams.consumers.dispatcher import MAX_IN_FLIGHT
+from evenflow.streams.consumers.scheduler import HostPolicy
 from evenflow.streams.producers import RedditSettings
+from evenflow.streams.producers.collect_links_reddit import REQUESTS_PER_SECOND
+from evenflow.shards import Shard, split_dispatcher, split_http_cache, MIN_POOL_SIZE
+from evenflow.utreq import HttpCache
+from evenflow.utreq.http_cache import MAX_BYTES
 
 
 def read_json_from(path: str):
@@ -17,7 +24,13 @@ def read_json_from(path: str):
 
 
 class Conf:
-    def __init__(self, config_file: str, restore: bool):
+    def __init__(
+            self,
+            config_file: str,
+            restore: bool,
+            loop_monitor: Optional[Dict] = None,
+            workers: Optional[int] = None
+    ):
         config_data = read_json_from(config_file)
         self.restore = restore
         self.backup_file_path = config_data.get("backup")
@@ -26,10 +39,46 @@ class Conf:
         self.pg_cred = config_data.get("pg_cred")
         self.rules: Dict = config_data.get("rules")
         self.reddit: Dict = config_data.get("reddit")
+        self.dispatcher: Dict = config_data.get("dispatcher", {})
+        self.queues: Dict = config_data.get("queues", {})
+        self.seen_snapshot: Optional[str] = config_data.get("seen_snapshot")
+        self.html_parser: Optional[str] = config_data.get("html_parser")
+        self.http_cache: Optional[Dict] = config_data.get("http_cache")
+        self.metrics: Dict = config_data.get("metrics", {})
+        self.log_level: str = config_data.get("log_level", "INFO")
+        self.loop_monitor: Optional[Dict] = loop_monitor or config_data.get("loop_monitor")
+        self.workers: int = int(workers or config_data.get("workers", 1))
+        self.shard: Optional[Shard] = None
+
+    def for_shard(self, index: int) -> 'Conf':
+        """the configuration of one of `workers` processes, with the shared limits split between them"""
+        shard = Shard(index, self.workers)
+        conf = copy.copy(self)
+        conf.shard = shard
+        conf.dispatcher = split_dispatcher(self.dispatcher, shard, MAX_IN_FLIGHT, HostPolicy())
+        if self.reddit is not None:
+            # the api quota belongs to the credentials, not to the process
+            rate = self.reddit.get("requests_per_second", REQUESTS_PER_SECOND)
+            conf.reddit = {**self.reddit, "requests_per_second": rate / shard.count}
+        if self.http_cache is not None:
+            conf.http_cache = split_http_cache(self.http_cache, shard, MAX_BYTES)
+        port, snapshot = self.metrics.get("prometheus_port"), self.metrics.get("snapshot")
+        conf.metrics = {
+            **self.metrics,
+            **({"prometheus_port": port + index} if port is not None else {}),
+            **({"snapshot": shard.suffixed(snapshot)} if snapshot is not None else {})
+        }
+        # a single snapshot file cannot hold what every worker has seen, each one reads the database instead
+        conf.seen_snapshot = None
+        return conf
+
+    def owns(self, key: str) -> bool:
+        return self.shard is None or self.shard.owns(key)
 
     def load_sources(self) -> Either[Exception, List[FeedScraper]]:
         try:
-            scrapers = list(filter(lambda x: x, [self.__new_reader(s.items()) for s in self.sources_json]))
+            readers = [self.__new_reader(s.items()) for s in self.sources_json]
+            scrapers = [reader for reader in readers if reader and self.owns(reader.shard_key())]
             if len(scrapers) == 0:
                 return Left[Exception](ValueError("No scrapers found"))
 
@@ -51,14 +100,17 @@ class Conf:
         if credentials is None:
             raise ValueError("credentials is not defined")
 
-        subreddits = {k: v for k, v in subs.items() if not self.__subreddit_over(k)}
+        subreddits = {k: v for k, v in subs.items() if not self.__subreddit_over(k) and self.owns(k)}
         if len(subreddits) == 0:
             raise ValueError("No subreddits found")
 
+        throttling = {k: self.reddit[k] for k in ["concurrency", "requests_per_second"] if k in self.reddit}
+
         return RedditSettings(
             subreddits=subreddits,
             num_posts=num_posts,
-            instance=praw.Reddit(**credentials)
+            instance=praw.Reddit(**credentials),
+            **throttling
         )
 
     def __subreddit_over(self, subreddit: str) -> bool:
@@ -75,7 +127,8 @@ class Conf:
         return Either.attempt(self.__load_reddit)
 
     def __new_reader(self, json_data: ItemsView) -> Optional[FeedScraper]:
-        reader = SiteFeed(**{k: v for k, v in json_data if k != "type"})
+        defaults = {"parser": self.html_parser} if self.html_parser is not None else {}
+        reader = SiteFeed(**{**defaults, **{k: v for k, v in json_data if k != "type"}})
         if not self.initial_state:
             return reader
 
@@ -99,32 +152,30 @@ class Conf:
     def __add_sets_to(article_rules: ArticleRules, dict_sets: Dict):
         for key, values in dict_sets.items():
             if key == "titles":
-                article_rules.add_title_check(lambda title: title not in set(values))
+                article_rules.add_blacklist(TITLE, values)
             elif key == "urls":
-                article_rules.add_url_check(lambda url: url not in set(values))
+                article_rules.add_blacklist(URL, values)
 
     @staticmethod
     def __add_min_lengths(article_rules: ArticleRules, dict_ml: Dict[str, int]):
-        def more_than(min_len: int, ch: str) -> bool:
-            return len(ch) >= min_len
-
         for key, value in dict_ml.items():
             if key == "title":
-                j = int(value)
-                article_rules.add_title_check(lambda t: more_than(j, t))
+                article_rules.add_min_length(TITLE, int(value))
             elif key == "text":
-                x = int(value)
-                article_rules.add_text_check(lambda t: more_than(x, t))
+                article_rules.add_min_length(TEXT, int(value))
             elif key == "path_loc":
-                z = int(value)
-                article_rules.add_path_check(lambda p: more_than(z, p))
+                article_rules.add_min_length(PATH, int(value))
 
     @staticmethod
-    def __load_backup(path: str) -> Optional[Dict[str, Dict]]:
-        try:
-            return read_json_from(path)
-        except FileNotFoundError:
-            return None
+    def __load_backup(path: Optional[str]) -> Optional[Dict[str, Dict]]:
+        return replay_journal(path) if path is not None else None
+
+    def make_http_cache(self) -> Optional[HttpCache]:
+        return HttpCache(**self.http_cache) if self.http_cache is not None else None
+
+    def __pool_size(self) -> int:
+        size = int(self.pg_cred.get("pool_size", POOL_SIZE))
+        return self.shard.split(size, MIN_POOL_SIZE) if self.shard is not None else size
 
     def setupdb(self) -> Optional[DatabaseCredentials]:
         try:
@@ -132,7 +183,8 @@ class Conf:
                 user=self.pg_cred["user"],
                 password=self.pg_cred["pwd"],
                 name=self.pg_cred["db"],
-                host=self.pg_cred["host"]
+                host=self.pg_cred["host"],
+                pool_size=self.__pool_size()
             )
         except KeyError:
             return None
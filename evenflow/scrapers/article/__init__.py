@@ -1,2 +1,3 @@
-from .article_scraper_factory import article_factory
+from .article_scraper_factory import article_factory, is_archived, post_parse_for
 from .article_scraper import ArticleScraper
+from .article_parser import ArticleParser, InlineParser, ProcessPoolParser, RejectedArticle, make_parser
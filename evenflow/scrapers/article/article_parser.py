@@ -0,0 +1,188 @@
+import abc
+import asyncio
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Callable, Dict, Tuple
+from newspaper.configuration import Configuration as NConf
+from evenflow.metrics import registry
+from evenflow.streams.messages import ArticleExtended, ArticleRecord
+from evenflow.streams.messages.functions import remove_newlines
+
+
+class RejectedArticle(Exception):
+    """raised when an article fails a content rule before nlp"""
+
+    def __init__(self, rule: str):
+        super().__init__(rule)
+        self.rule = rule
+
+
+class Content:
+    __slots__ = ('title', 'text')
+
+    def __init__(self, title: str, text: str):
+        self.title = title
+        self.text = text
+
+
+PostParse = Optional[Callable[[ArticleExtended], ArticleExtended]]
+PostFor = Optional[Callable[[str], PostParse]]
+ContentChecks = Optional[Callable[[Content], Optional[str]]]
+Timings = Dict[str, float]
+PARSER_OVERHEAD = registry.histogram(
+    "evenflow_parser_overhead_seconds",
+    "time an article spends waiting for and travelling to a parse worker"
+)
+
+
+class Stopwatch:
+    def __init__(self):
+        self.timings: Timings = {}
+        self.__last = time.perf_counter()
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.timings[stage] = now - self.__last
+        self.__last = now
+
+
+def parse_article(
+        html: str,
+        url_to_visit: str,
+        scraped_from: str,
+        fake: bool,
+        conf: NConf,
+        post: PostParse = None,
+        checks: ContentChecks = None
+) -> Tuple[ArticleRecord, Timings]:
+    watch = Stopwatch()
+    article = ArticleExtended(
+        html=html,
+        url_to_visit=url_to_visit,
+        scraped_from=scraped_from,
+        fake=fake,
+        conf=conf,
+        do_nlp=False
+    ).correct_title()
+    watch.lap("parse")
+
+    if checks is not None:
+        rejected_by = checks(Content(article.title, remove_newlines(article.text)))
+        if rejected_by is not None:
+            raise RejectedArticle(rejected_by)
+        watch.lap("checks")
+
+    article.nlp()
+    watch.lap("nlp")
+
+    article = article.remove_newlines_from_fields()
+    if post is not None:
+        article = post(article)
+    record = article.release_documents().to_record()
+    watch.lap("record")
+    return record, watch.timings
+
+
+class ArticleParser(abc.ABC):
+    def __init__(self, conf: NConf, checks: ContentChecks = None, post: PostFor = None):
+        self.conf = conf
+        self.checks = checks
+        self.post = post
+
+    @abc.abstractmethod
+    async def parse(self, html: str, url_to_visit: str, scraped_from: str, fake: bool) -> ArticleRecord:
+        pass
+
+    @staticmethod
+    def observe(timings: Timings):
+        for stage, seconds in timings.items():
+            registry.histogram("evenflow_parse_seconds", "time spent parsing an article", stage=stage).observe(seconds)
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> 'ArticleParser':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def parse_with(
+        html: str,
+        url_to_visit: str,
+        scraped_from: str,
+        fake: bool,
+        conf: NConf,
+        post: PostFor,
+        checks: ContentChecks
+) -> Tuple[ArticleRecord, Timings]:
+    hook = post(url_to_visit) if post is not None else None
+    return parse_article(html, url_to_visit, scraped_from, fake, conf, hook, checks)
+
+
+class InlineParser(ArticleParser):
+    def __init__(self, conf: NConf, checks: ContentChecks = None, post: PostFor = None):
+        super().__init__(conf, checks, post)
+
+    async def parse(self, html: str, url_to_visit: str, scraped_from: str, fake: bool) -> ArticleRecord:
+        record, timings = parse_with(html, url_to_visit, scraped_from, fake, self.conf, self.post, self.checks)
+        self.observe(timings)
+        return record
+
+
+# set once in every pool worker, so that only the page itself crosses the process boundary
+_installed: Optional[Tuple[NConf, PostFor, ContentChecks]] = None
+
+
+def install(conf: NConf, post: PostFor, checks: ContentChecks):
+    global _installed
+    _installed = (conf, post, checks)
+
+
+def parse_installed(html: str, url_to_visit: str, scraped_from: str, fake: bool) -> Tuple[ArticleRecord, Timings]:
+    conf, post, checks = _installed
+    return parse_with(html, url_to_visit, scraped_from, fake, conf, post, checks)
+
+
+class ProcessPoolParser(ArticleParser):
+    def __init__(
+            self,
+            conf: NConf,
+            loop: asyncio.events,
+            workers: Optional[int] = None,
+            checks: ContentChecks = None,
+            post: PostFor = None
+    ):
+        super().__init__(conf, checks, post)
+        self.loop = loop
+        self.__executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=install,
+            initargs=(conf, post, checks)
+        )
+
+    async def parse(self, html: str, url_to_visit: str, scraped_from: str, fake: bool) -> ArticleRecord:
+        start = time.perf_counter()
+        record, timings = await self.loop.run_in_executor(
+            self.__executor, parse_installed, html, url_to_visit, scraped_from, fake
+        )
+        PARSER_OVERHEAD.observe(max(0.0, time.perf_counter() - start - sum(timings.values())))
+        self.observe(timings)
+        return record
+
+    def close(self):
+        self.__executor.shutdown(wait=False)
+
+
+def make_parser(
+        conf: NConf,
+        loop: asyncio.events,
+        workers: Optional[int] = None,
+        checks: ContentChecks = None,
+        post: PostFor = None
+) -> ArticleParser:
+    if workers == 0:
+        return InlineParser(conf, checks, post)
+    return ProcessPoolParser(conf, loop, workers, checks, post)
@@ -2,13 +2,14 @@ import abc
 import re
 from typing import Optional
 from aiohttp import ClientSession as Sess
-from newspaper.configuration import Configuration as NConf
-from functools import partial
-from dirtyfunc import Either, Left
+from dirtyfunc import Either, Left, Right
 from evenflow import utreq
 from evenflow.streams.messages.article_extended import ArticleExtended
+from evenflow.streams.messages.article_record import ArticleRecord as Record
 from evenflow.urlman import functions
 
+from .article_parser import ArticleParser
+
 
 class ArchivedURLNotFound(Exception):
     """raised when original url is not found in archive.* websites"""
@@ -18,21 +19,41 @@ class ArchivedURLNotFound(Exception):
 class ArticleScraper(abc.ABC):
 
     @abc.abstractmethod
-    async def get_data(self, session: Sess, conf: NConf, timeout: Optional[int]) -> Either[Exception, ArticleExtended]:
+    async def get_data(
+            self,
+            session: Sess,
+            parser: ArticleParser,
+            timeout: Optional[int],
+            max_bytes: int = utreq.MAX_BODY_BYTES
+    ) -> Either[Exception, Record]:
         pass
 
 
 class DefaultArticleScraper(ArticleScraper):
     def __init__(self, article_link: str, source: str, fake: bool):
         self.article_link = article_link
-        self.partial = partial(ArticleExtended, url_to_visit=article_link, scraped_from=source, fake=fake)
-
-    async def get_data(self, session: Sess, conf: NConf, timeout: Optional[int]) -> Either[Exception, ArticleExtended]:
+        self.source = source
+        self.fake = fake
+
+    async def get_data(
+            self,
+            session: Sess,
+            parser: ArticleParser,
+            timeout: Optional[int],
+            max_bytes: int = utreq.MAX_BODY_BYTES
+    ) -> Either[Exception, Record]:
         try:
-            maybe_html = await utreq.get_html(self.article_link, session, timeout)
-            maybe_article = maybe_html.map(lambda html: self.partial(conf=conf, html=html))
-            corrected_title = maybe_article.map(lambda a: a.correct_title())
-            return corrected_title.map(lambda a: a.remove_newlines_from_fields())
+            maybe_html = await utreq.get_html(self.article_link, session, timeout, max_bytes=max_bytes)
+            if maybe_html.empty:
+                return maybe_html
+
+            article = await parser.parse(
+                html=maybe_html.on_right(),
+                url_to_visit=self.article_link,
+                scraped_from=self.source,
+                fake=self.fake
+            )
+            return Right(article)
         except Exception as e:
             return Left(e)
 
@@ -43,25 +64,27 @@ class Archive(DefaultArticleScraper):
 
     @staticmethod
     def title_extraction(article: ArticleExtended) -> ArticleExtended:
-        url = article.soup.select_one("#HEADER > table input")["value"]
+        url = article.page.select_one("#HEADER > table input")["value"]
         if url:
             return article.set_actual_url(url).update_date()
         raise ArchivedURLNotFound(f"url not found for {article.url_to_visit}, scraped_from: {article.scraped_from}")
 
-    async def get_data(self, session: Sess, conf: NConf, timeout: Optional[int]) -> Either[Exception, ArticleExtended]:
-        maybe_article = await super().get_data(session, conf, timeout)
-        return maybe_article.flat_map(lambda a: Either.attempt(partial(self.title_extraction, a)))
-
 
 class WebArchive(DefaultArticleScraper):
     def __init__(self, article_link: str, source: str, fake: bool):
         super().__init__(article_link, source, fake)
 
-    async def get_data(self, session: Sess, conf: NConf, timeout: Optional[int]) -> Either[Exception, ArticleExtended]:
+    async def get_data(
+            self,
+            session: Sess,
+            parser: ArticleParser,
+            timeout: Optional[int],
+            max_bytes: int = utreq.MAX_BODY_BYTES
+    ) -> Either[Exception, Record]:
         maybe_url = re.findall("(https?://[^\\s]+)", functions.maintain_path(self.article_link))
 
         if len(maybe_url) > 0:
-            maybe_article = await super().get_data(session, conf, timeout)
+            maybe_article = await super().get_data(session, parser, timeout, max_bytes)
             return maybe_article.map(lambda a: a.set_actual_url(maybe_url[0]).update_date())
 
         return Left(ArchivedURLNotFound(f"encoded URL not found in {self.article_link}"))
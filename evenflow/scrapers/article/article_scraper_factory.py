@@ -1,13 +1,27 @@
 import re
 
+from .article_parser import PostParse
 from .article_scraper import ArticleScraper, Archive, WebArchive, DefaultArticleScraper
 
 
+ARCHIVE = re.compile('^https?://archive[.]')
+WEB_ARCHIVE = re.compile('^https?://web[.]archive[.]')
+
+
+def is_archived(link: str) -> bool:
+    return ARCHIVE.match(link) is not None or WEB_ARCHIVE.match(link) is not None
+
+
+def post_parse_for(link: str) -> PostParse:
+    """the hook applied to a parsed article, installed once in every parse worker"""
+    return Archive.title_extraction if ARCHIVE.match(link) else None
+
+
 def article_factory(link: str, source: str, fake: bool) -> ArticleScraper:
-    if re.match('^https?://archive[.]', link):
+    if ARCHIVE.match(link):
         return Archive(link, source, fake)
 
-    if re.match('^https?://web[.]archive[.]', link):
+    if WEB_ARCHIVE.match(link):
         return WebArchive(link, source, fake)
 
     return DefaultArticleScraper(link, source, fake)
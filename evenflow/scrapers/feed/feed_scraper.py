@@ -1,7 +1,10 @@
 import abc
+from typing import Optional
 from dirtyfunc import Option
 from aiohttp import ClientSession
 
+from evenflow.utreq import HttpCache
+
 from evenflow.streams.messages.data_keeper import DataKeeper
 from evenflow.streams.messages.collector_state import CollectorState
 
@@ -17,13 +20,16 @@ class FeedScraper(abc.ABC):
         pass
 
     @abc.abstractmethod
-    async def fetch_links(self, session: ClientSession) -> 'FeedResult':
+    async def fetch_links(self, session: ClientSession, cache: Optional[HttpCache] = None) -> 'FeedResult':
         pass
 
     @abc.abstractmethod
     def recover_state(self, state: CollectorState) -> bool:
         pass
 
+    def shard_key(self) -> str:
+        return self.get_name()
+
 
 class FeedResult:
     def __init__(self, articles: DataKeeper, next_page: Option[FeedScraper], state: CollectorState):
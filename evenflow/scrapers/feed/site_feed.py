@@ -1,9 +1,12 @@
-from typing import List, Dict, Union, Set, Optional
+import asyncio
+
+from typing import List, Dict, Union, Set, Optional, Tuple
 from aiohttp import ClientSession
-from bs4 import BeautifulSoup
 from dirtyfunc import Option, Either, Left, Right, Nothing
 
 from evenflow import utreq
+from evenflow.utreq import Document, HttpCache
+from evenflow.urlman.functions import host
 from evenflow.streams.messages import DataKeeper
 
 from evenflow.streams.messages.collector_state import CollectorState
@@ -11,6 +14,7 @@ from .feed_scraper import FeedResult, FeedScraper
 
 URL = 'url'
 PAGE = 'page'
+CONCURRENCY = 4
 
 
 class Selectors:
@@ -28,7 +32,7 @@ class FetchLinksCondition:
     def satisfied(self, value: str) -> bool:
         return value.lower().strip() in self.values
 
-    def check(self, page: BeautifulSoup) -> bool:
+    def check(self, page: Document) -> bool:
         for element in page.select(self.value_container):
             if self.satisfied(element.text):
                 return True
@@ -60,8 +64,8 @@ class FeedContainer(UrlContainer):
 
 
 class UrlExtractor:
-    def __init__(self, page: BeautifulSoup):
-        self.__page: BeautifulSoup = page
+    def __init__(self, page: Document):
+        self.__page: Document = page
 
     def make_url_container(self, list_selector: str, condition: Optional[FetchLinksCondition] = None) -> UrlContainer:
         if condition and condition.check(self.__page) or not condition:
@@ -89,7 +93,9 @@ class SiteFeed(FeedScraper):
             sel: Union[Dict, Selectors],
             stop_after: int,
             fake_news: bool,
-            condition: Optional[Union[Dict, FetchLinksCondition]] = None
+            condition: Optional[Union[Dict, FetchLinksCondition]] = None,
+            concurrency: int = CONCURRENCY,
+            parser: str = utreq.HTML5LIB
     ):
         self.name = name
         self.url = url
@@ -97,10 +103,16 @@ class SiteFeed(FeedScraper):
         self.sel = Selectors(**sel) if isinstance(sel, dict) else sel
         self.condition = FetchLinksCondition(**condition) if isinstance(condition, dict) else condition
         self.fake_news = fake_news
+        self.concurrency = concurrency
+        self.parser = parser
 
     def get_name(self) -> str:
         return self.name
 
+    def shard_key(self) -> str:
+        # pages of a feed stay on its host, so resuming from a later page keeps the feed on the same shard
+        return host(self.url) or self.url
+
     def recover_state(self, state: CollectorState) -> bool:
         if state.is_over:
             return False
@@ -108,8 +120,12 @@ class SiteFeed(FeedScraper):
         self.stop_after = state.data[PAGE]
         return True
 
-    async def fetch_links(self, session: ClientSession) -> Either[Exception, 'FeedResult']:
-        maybe_feed = await self.__extract_feed(session)
+    async def fetch_links(
+            self,
+            session: ClientSession,
+            cache: Optional[HttpCache] = None
+    ) -> Either[Exception, 'FeedResult']:
+        maybe_feed = await self.__extract_feed(session, cache)
         if maybe_feed.empty:
             return maybe_feed.on_left(lambda exc: Left(exc))
 
@@ -117,7 +133,7 @@ class SiteFeed(FeedScraper):
         next_reader = feed.maybe_next.flat_map(self.__new_page)
 
         defined = FeedResult(
-            articles=await self.__extract_links(session, *feed.urls),
+            articles=await self.__extract_links(session, cache, *feed.urls),
             next_page=next_reader,
             state=self.to_state(over=next_reader.empty)
         )
@@ -142,23 +158,40 @@ class SiteFeed(FeedScraper):
             sel=self.sel,
             stop_after=self.stop_after - 1,
             fake_news=self.fake_news,
-            condition=self.condition
+            condition=self.condition,
+            concurrency=self.concurrency,
+            parser=self.parser
         )
         return Option(defined)
 
-    async def __extract_links(self, session: ClientSession, *urls: str) -> DataKeeper:
+    async def __extract_links(self, session: ClientSession, cache: Optional[HttpCache], *urls: str) -> DataKeeper:
         arts = DataKeeper()
-        for url in urls:
-            maybe_resp = await utreq.new_soup(url, session)
-            maybe_page = maybe_resp.map(
-                lambda page: UrlExtractor(page).make_url_container(self.sel.links, self.condition)
-            )
-            maybe_urls = maybe_page.map(lambda container: container.to_dict([(url, self.fake_news)]))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pages = await asyncio.gather(*[self.__extract_page(session, cache, semaphore, url) for url in urls])
+        for url, maybe_urls in zip(urls, pages):
             arts.add_page_hrefs(url, self.fake_news, maybe_urls)
         return arts
 
-    async def __extract_feed(self, session: ClientSession) -> Either[Exception, UrlContainer]:
-        maybe_page = await utreq.new_soup(self.url, session)
+    async def __extract_page(
+            self,
+            session: ClientSession,
+            cache: Optional[HttpCache],
+            semaphore: asyncio.Semaphore,
+            url: str
+    ) -> Either[Exception, Dict[str, Tuple[str, bool]]]:
+        async with semaphore:
+            maybe_resp = await utreq.new_document(url, session, self.parser, cache)
+        maybe_page = maybe_resp.map(
+            lambda page: UrlExtractor(page).make_url_container(self.sel.links, self.condition)
+        )
+        return maybe_page.map(lambda container: container.to_dict([(url, self.fake_news)]))
+
+    async def __extract_feed(
+            self,
+            session: ClientSession,
+            cache: Optional[HttpCache]
+    ) -> Either[Exception, UrlContainer]:
+        maybe_page = await utreq.new_document(self.url, session, self.parser, cache)
         return maybe_page.map(
             lambda page: UrlExtractor(page).make_feed_container(
                 list_selector=self.sel.entries,
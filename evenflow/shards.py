@@ -0,0 +1,68 @@
+import os
+import zlib
+
+from typing import Dict, Optional, Any
+from evenflow.urlman.functions import host
+
+MIN_POOL_SIZE = 2
+# every worker schedules whatever links its feeds yield, so a host linked from several shards
+# is fetched by several schedulers at once: each one only gets its part of the per-host budget
+SPLIT_HOST_RATES = ("rate", "min_rate")
+SPLIT_HOST_LIMITS = ("burst", "initial_concurrency", "max_concurrency")
+
+
+def shard_of(key: str, count: int) -> int:
+    """crc32 rather than hash(): it must agree across processes and across runs"""
+    return zlib.crc32(key.encode('utf-8')) % count
+
+
+class Shard:
+    def __init__(self, index: int, count: int):
+        if not 0 <= index < count:
+            raise ValueError(f"shard {index} out of {count}")
+        self.index = index
+        self.count = count
+
+    def owns(self, key: str) -> bool:
+        return shard_of(key, self.count) == self.index
+
+    def owns_url(self, url: str) -> bool:
+        return self.owns(host(url) or url)
+
+    def split(self, total: int, minimum: int = 1) -> int:
+        """this shard's part of a limit shared by all the workers"""
+        return max(minimum, total // self.count + (1 if self.index < total % self.count else 0))
+
+    def suffixed(self, path: Optional[str]) -> Optional[str]:
+        return f"{path}.{self.index}" if path is not None else None
+
+    def __repr__(self) -> str:
+        return f"shard {self.index + 1}/{self.count}"
+
+
+def split_hosts(policy: Dict[str, Any], shard: Shard) -> Dict[str, Any]:
+    rates = {key: policy[key] / shard.count for key in SPLIT_HOST_RATES}
+    limits = {key: max(1.0, policy[key] / shard.count) for key in SPLIT_HOST_LIMITS}
+    return {**policy, **rates, **limits}
+
+
+def split_dispatcher(options: Dict, shard: Shard, max_in_flight: int, host_defaults: Any) -> Dict:
+    """host_defaults is the HostPolicy the dispatcher falls back to, its fields are overridden by options["hosts"]"""
+    parse_workers = options.get("parse_workers")
+    return {
+        **options,
+        "max_in_flight": shard.split(options.get("max_in_flight", max_in_flight)),
+        # 0 keeps parsing inline, otherwise the cores are shared between the workers' pools
+        "parse_workers": 0 if parse_workers == 0 else shard.split(parse_workers or os.cpu_count() or 1),
+        "hosts": split_hosts({**vars(host_defaults), **(options.get("hosts") or {})}, shard),
+        "shared_journal": True
+    }
+
+
+def split_http_cache(options: Dict, shard: Shard, max_bytes: int) -> Dict:
+    """every worker evicts by lru from its own directory, a shared one would have them delete each other's pages"""
+    return {
+        **options,
+        "directory": shard.suffixed(options["directory"]),
+        "max_bytes": shard.split(options.get("max_bytes", max_bytes))
+    }
@@ -1,2 +1,10 @@
-from .dispatcher import DefaultDispatcher, DispatcherQueues, DispatcherSettings, dispatch_links, ArticleRules
+from .dispatcher import (
+    DefaultDispatcher,
+    DispatcherQueues,
+    DispatcherSettings,
+    DuplicateChecker,
+    dispatch_links
+)
+from .rules import ArticleRules, RulePlan, TITLE, TEXT, PATH, URL
+from .checkpoint import CheckpointJournal, replay_journal
 from .pg import store_articles, store_errors, delete_errors
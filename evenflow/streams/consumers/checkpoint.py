@@ -0,0 +1,181 @@
+import asyncio
+import fcntl
+import json
+import os
+import time
+
+from contextlib import contextmanager
+from typing import Optional, Dict, IO, Iterator, Tuple
+
+ALWAYS, INTERVAL, NEVER = "always", "interval", "never"
+FSYNC_INTERVAL = 1.0
+COMPACT_EVERY = 1000
+
+
+def read_entries(lines: Iterator[str]) -> Iterator[Tuple[str, Dict]]:
+    for line in lines:
+        try:
+            name, state = json.loads(line)
+        except ValueError:
+            # a torn write at the tail of the journal, everything before it is intact
+            continue
+        yield name, state
+
+
+def replay_journal(path: str) -> Optional[Dict[str, Dict]]:
+    """rebuilds the collectors state from a journal, or from a legacy whole-dict backup"""
+    try:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            text = f.read()
+    except FileNotFoundError:
+        return None
+
+    if text.lstrip().startswith('{'):
+        return json.loads(text)
+
+    state: Dict[str, Dict] = {}
+    for name, value in read_entries(iter(text.splitlines())):
+        state[name] = value
+    return state
+
+
+def entry(name: str, state: Dict) -> str:
+    return json.dumps([name, state], separators=(',', ':')) + '\n'
+
+
+class CheckpointJournal:
+    """
+    append-only log of CollectorState deltas, one json [name, state] pair per line;
+    replaying it in order yields the latest state of every collector.
+    A shared journal is written by several processes, each owning different collectors:
+    every write holds an flock on `path.lock` and compaction merges what is on disk
+    with the entries this process stored, so no process drops the others' progress
+    """
+
+    def __init__(
+            self,
+            path: Optional[str],
+            initial_state: Optional[Dict],
+            fsync: str = INTERVAL,
+            fsync_interval: float = FSYNC_INTERVAL,
+            compact_every: int = COMPACT_EVERY,
+            shared: bool = False
+    ):
+        if fsync not in {ALWAYS, INTERVAL, NEVER}:
+            raise ValueError(f"unknown fsync policy {fsync}")
+        self.path = path
+        self.state: Dict[str, Dict] = {} if not initial_state else dict(initial_state)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.shared = shared
+        self.__own: Dict[str, Dict] = {}
+        self.__file: Optional[IO] = None
+        self.__lock_file: Optional[IO] = None
+        self.__appended = 0
+        self.__synced = time.monotonic()
+        self.__lock = asyncio.Lock()
+
+    async def store(self, add: Dict[str, Dict]):
+        if self.path is None or len(add) == 0:
+            return
+
+        async with self.__lock:
+            self.state.update(add)
+            self.__own.update(add)
+            if self.__file is None or self.__appended >= self.compact_every:
+                await self.__compact()
+                return
+
+            lines = ''.join(entry(name, value) for name, value in add.items())
+            if self.shared:
+                # the lock may be held by another process, keep the wait off the loop
+                await asyncio.get_event_loop().run_in_executor(None, self.__append, lines)
+            else:
+                self.__append(lines)
+            self.__appended += len(add)
+            if self.__must_sync():
+                await asyncio.get_event_loop().run_in_executor(None, self.__sync)
+
+    def __append(self, lines: str):
+        with self.__exclusive():
+            self.__follow()
+            self.__file.write(lines)
+            self.__file.flush()
+
+    @contextmanager
+    def __exclusive(self):
+        if not self.shared:
+            yield
+            return
+        if self.__lock_file is None:
+            self.__lock_file = open(f"{self.path}.lock", 'a')
+        fcntl.flock(self.__lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.__lock_file.fileno(), fcntl.LOCK_UN)
+
+    def __follow(self):
+        """reopens the journal if another process compacted it into a new file"""
+        if not self.shared:
+            return
+        try:
+            replaced = os.stat(self.path).st_ino != os.fstat(self.__file.fileno()).st_ino
+        except FileNotFoundError:
+            replaced = True
+        if replaced:
+            self.__file.close()
+            self.__file = open(self.path, 'a', encoding='utf-8')
+
+    def __must_sync(self) -> bool:
+        if self.fsync == ALWAYS:
+            return True
+        return self.fsync == INTERVAL and time.monotonic() - self.__synced >= self.fsync_interval
+
+    def __sync(self):
+        os.fsync(self.__file.fileno())
+        self.__synced = time.monotonic()
+
+    async def __compact(self):
+        await asyncio.get_event_loop().run_in_executor(None, self.__rewrite, self.__snapshot())
+
+    def __snapshot(self) -> Dict[str, Dict]:
+        # the initial state of a shared journal is already on disk, and other processes may have moved past it
+        return dict(self.__own) if self.shared else dict(self.state)
+
+    def __rewrite(self, snapshot: Dict[str, Dict]):
+        """writes the whole state to a temporary file and atomically swaps it in"""
+        if self.__file is not None:
+            self.__file.close()
+
+        with self.__exclusive():
+            if self.shared:
+                snapshot = {**(replay_journal(self.path) or {}), **snapshot}
+
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(entry(name, value) for name, value in snapshot.items()))
+                f.flush()
+                if self.fsync != NEVER:
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+        self.__file = open(self.path, 'a', encoding='utf-8')
+        self.__appended = 0
+        self.__synced = time.monotonic()
+
+    def close(self):
+        if self.__file is not None:
+            self.__rewrite(self.__snapshot())
+            self.__file.close()
+            self.__file = None
+        if self.__lock_file is not None:
+            self.__lock_file.close()
+            self.__lock_file = None
+
+    def __enter__(self) -> 'CheckpointJournal':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
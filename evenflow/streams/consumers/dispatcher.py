@@ -1,17 +1,41 @@
 import asyncio
-import json
+import logging
+import os
+import time
 
-from typing import Optional, List, Dict, Tuple, Callable
+from typing import Optional, List, Dict, Tuple, Set
 
-import aiofiles
 from aiohttp import TCPConnector, ClientSession
 from newspaper.configuration import Configuration
 from dirtyfunc import Either, Left, Right
 
-from evenflow.scrapers.article import article_factory
-from evenflow.streams.messages import ArticleExtended, Error, DataKeeper
-
-LIMIT_PER_HOST = 2
+from evenflow.metrics import registry
+from evenflow.scrapers.article import (
+    article_factory,
+    is_archived,
+    post_parse_for,
+    ArticleParser,
+    RejectedArticle,
+    make_parser
+)
+from evenflow.streams.messages import ArticleRecord, Error, DataKeeper
+from evenflow.urlman import SeenIndex
+from evenflow.utreq import MAX_BODY_BYTES
+
+from .rules import ArticleRules
+from .checkpoint import CheckpointJournal, INTERVAL, COMPACT_EVERY
+from .scheduler import HostScheduler, HostPolicy
+from .retry import RetryQueue, RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_SECONDS = registry.histogram("evenflow_article_seconds", "time to fetch and parse an article")
+RULES_SECONDS = registry.histogram("evenflow_rules_seconds", "time spent checking rules on a batch of articles")
+
+MAX_IN_FLIGHT = 64
+DNS_CACHE_TTL = 600
+BATCH_SIZE = 50
+BATCH_AGE = 5.0
 
 firefox = {
     "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:66.0) Gecko/20100101 Firefox/66.0",
@@ -31,48 +55,59 @@ def newspaper_config() -> Configuration:
     return conf
 
 
-class BackupManager:
-    __INDENT = 2
+class DuplicateChecker:
+    """
+    urls and titles of stored articles live in the seen indexes, which are dumped to the snapshot;
+    articles on their way to the database are only held in memory, so that a rejected or failed
+    article is not remembered as seen by later runs
+    """
 
-    def __init__(self, backup_path: Optional[str], initial_state: Optional[Dict]):
-        self.path = backup_path
-        self.state = {} if not initial_state else initial_state
+    def __init__(self, urls: Optional[SeenIndex] = None, titles: Optional[SeenIndex] = None):
+        self.duplicate_url = urls if urls is not None else SeenIndex()
+        self.duplicate_title = titles if titles is not None else SeenIndex()
+        self.__pending_urls: Set[int] = set()
+        self.__pending_titles: Set[int] = set()
 
-    async def store(self, add: Dict[str, Dict]):
-        if self.path is not None:
-            self.state = {**self.state, **add}
-            async with aiofiles.open(self.path, mode='w') as f:
-                await f.write(json.dumps(self.state, indent=self.__INDENT))
+    def seen_url(self, url: str) -> bool:
+        return url in self.duplicate_url or SeenIndex.key(url) in self.__pending_urls
 
+    def is_valid(self, a: Optional[ArticleRecord]) -> bool:
 
-class ArticleRules:
-    def __init__(self, url_checker: Callable[[str, bool, bool], bool]):
-        self.__url_checker = url_checker
-        self.__custom_checks: List[Callable[[ArticleExtended], bool]] = []
+        if a is None:
+            return False
 
-    def add_check(self, check: Callable[[ArticleExtended], bool]):
-        self.__custom_checks.append(lambda a: check(a))
+        title = SeenIndex.key(a.title)
+        url = SeenIndex.key(a.actual_url)
 
-    def add_title_check(self, check: Callable[[str], bool]):
-        self.add_check(lambda a: check(a.title))
+        if title in self.__pending_titles or a.title in self.duplicate_title:
+            return False
 
-    def add_text_check(self, check: Callable[[str], bool]):
-        self.add_check(lambda a: check(a.text))
+        if url in self.__pending_urls or a.actual_url in self.duplicate_url:
+            return False
 
-    def add_path_check(self, check: Callable[[str], bool]):
-        self.add_check(lambda a: check(a.path))
+        self.__pending_urls.update([url, SeenIndex.key(a.url_to_visit)])
+        self.__pending_titles.add(title)
 
-    def add_url_check(self, check: Callable[[str], bool]):
-        self.add_check(lambda a: check(a.actual_url))
+        return True
 
-    def url_is_valid(self, url: str, from_fake: bool, archived: bool) -> bool:
-        return self.__url_checker(url, from_fake, archived)
+    def stored(self, a: ArticleRecord):
+        for url in [a.actual_url, a.url_to_visit]:
+            self.duplicate_url.add(url)
+            self.__pending_urls.discard(SeenIndex.key(url))
+        self.duplicate_title.add(a.title)
+        self.__pending_titles.discard(SeenIndex.key(a.title))
 
-    def pass_checks(self, a: ArticleExtended) -> bool:
-        for check in self.__custom_checks:
-            if not check(a):
-                return False
-        return True
+    def dump(self, path: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            self.duplicate_url.to_file(f)
+            self.duplicate_title.to_file(f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str) -> 'DuplicateChecker':
+        with open(path, 'rb') as f:
+            return DuplicateChecker(urls=SeenIndex.from_file(f), titles=SeenIndex.from_file(f))
 
 
 class DispatcherSettings:
@@ -85,7 +120,18 @@ class DispatcherSettings:
             timeout: int,
             loop: asyncio.events,
             backup_path: Optional[str] = None,
-            initial_state: Optional[Dict] = None
+            initial_state: Optional[Dict] = None,
+            parse_workers: Optional[int] = None,
+            max_in_flight: int = MAX_IN_FLIGHT,
+            batch_size: int = BATCH_SIZE,
+            batch_age: float = BATCH_AGE,
+            duplicates: Optional[DuplicateChecker] = None,
+            checkpoint_fsync: str = INTERVAL,
+            checkpoint_compact_every: int = COMPACT_EVERY,
+            host_policy: Optional[HostPolicy] = None,
+            max_body: int = MAX_BODY_BYTES,
+            retry_policy: Optional[RetryPolicy] = None,
+            shared_journal: bool = False
     ):
         self.connector = connector
         self.headers = headers
@@ -95,16 +141,48 @@ class DispatcherSettings:
         self.backup_path = backup_path
         self.state = initial_state
         self.timeout = timeout
+        self.parse_workers = parse_workers
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.batch_age = batch_age
+        self.duplicates = duplicates if duplicates is not None else DuplicateChecker()
+        self.checkpoint_fsync = checkpoint_fsync
+        self.checkpoint_compact_every = checkpoint_compact_every
+        self.host_policy = host_policy if host_policy is not None else HostPolicy()
+        self.max_body = max_body
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.shared_journal = shared_journal
 
     def make_session(self) -> ClientSession:
         return ClientSession(connector=self.connector, headers=self.headers, loop=self.loop)
 
-    def make_backup_manager(self) -> BackupManager:
-        return BackupManager(self.backup_path, self.state)
+    def make_parser(self) -> ArticleParser:
+        return make_parser(
+            conf=self.newspaper_conf,
+            loop=self.loop,
+            workers=self.parse_workers,
+            checks=self.rules.content_plan.rejected_by,
+            post=post_parse_for
+        )
+
+    def make_scheduler(self) -> HostScheduler:
+        return HostScheduler(self.loop, high_water=self.max_in_flight, policy=self.host_policy)
+
+    def make_journal(self) -> CheckpointJournal:
+        return CheckpointJournal(
+            self.backup_path,
+            self.state,
+            fsync=self.checkpoint_fsync,
+            compact_every=self.checkpoint_compact_every,
+            shared=self.shared_journal
+        )
 
     def unpack_check(self, url: str, item: Tuple[str, bool]):
         _, from_fake = item
-        return self.rules.url_is_valid(url, from_fake, False)
+        if self.duplicates.seen_url(url) or not self.rules.url_is_valid(url, from_fake, False):
+            return False
+        # archived links only reveal the url the rules care about once parsed
+        return is_archived(url) or self.rules.pass_url_checks(url)
 
 
 class DefaultDispatcher(DispatcherSettings):
@@ -114,17 +192,45 @@ class DefaultDispatcher(DispatcherSettings):
             loop: asyncio.events,
             backup_path: Optional[str] = None,
             initial_state: Optional[Dict] = None,
-            timeout: int = 60
+            timeout: int = 60,
+            parse_workers: Optional[int] = None,
+            max_in_flight: int = MAX_IN_FLIGHT,
+            batch_size: int = BATCH_SIZE,
+            batch_age: float = BATCH_AGE,
+            duplicates: Optional[DuplicateChecker] = None,
+            checkpoint_fsync: str = INTERVAL,
+            checkpoint_compact_every: int = COMPACT_EVERY,
+            hosts: Optional[Dict] = None,
+            max_body: int = MAX_BODY_BYTES,
+            retries: Optional[Dict] = None,
+            shared_journal: bool = False
     ):
+        host_policy = HostPolicy(**hosts) if hosts is not None else HostPolicy()
         super().__init__(
-            connector=TCPConnector(limit_per_host=LIMIT_PER_HOST),
+            connector=TCPConnector(
+                limit=max_in_flight,
+                limit_per_host=int(host_policy.max_concurrency),
+                use_dns_cache=True,
+                ttl_dns_cache=DNS_CACHE_TTL
+            ),
             headers=firefox,
             rules=rules,
             loop=loop,
             backup_path=backup_path,
             initial_state=initial_state,
             newspaper_conf=newspaper_config(),
-            timeout=timeout
+            timeout=timeout,
+            parse_workers=parse_workers,
+            max_in_flight=max_in_flight,
+            batch_size=batch_size,
+            batch_age=batch_age,
+            duplicates=duplicates,
+            checkpoint_fsync=checkpoint_fsync,
+            checkpoint_compact_every=checkpoint_compact_every,
+            host_policy=host_policy,
+            max_body=max_body,
+            retry_policy=RetryPolicy(**retries) if retries is not None else None,
+            shared_journal=shared_journal
         )
 
 
@@ -137,8 +243,8 @@ class DispatcherQueues:
     async def send_error(self, error: Error):
         await self.error.put(error)
 
-    async def send_articles(self, articles: List[ArticleExtended]):
-        print(f"sending {len(articles)}")
+    async def send_articles(self, articles: List[ArticleRecord]):
+        logger.info("sending %d articles to storage", len(articles))
         await self.storage.put(articles)
 
     async def receive_links(self) -> DataKeeper:
@@ -148,74 +254,84 @@ class DispatcherQueues:
         self.links.task_done()
 
 
-class DuplicateChecker:
-    def __init__(self):
-        self.duplicate_title = set()
-        self.duplicate_url = set()
-
-    def is_valid(self, a: Optional[ArticleExtended]) -> bool:
-
-        if a is None:
-            return False
-
-        title = a.title.strip()
-        url = a.actual_url.strip()
-
-        if title in self.duplicate_title:
-            return False
-
-        if url in self.duplicate_url:
-            return False
-
-        self.duplicate_url.add(url)
-        self.duplicate_title.add(title)
-
-        return True
-
-    def flush_dicts(self):
-        self.duplicate_title = set()
-        self.duplicate_url = set()
-
-
 class ArticleListManager:
-    def __init__(self, rules: ArticleRules):
-        self.__duplicate_checker = DuplicateChecker()
-        self.__list: List[ArticleExtended] = []
+    def __init__(self, rules: ArticleRules, duplicate_checker: DuplicateChecker):
+        self.__duplicate_checker = duplicate_checker
+        self.__list: List[ArticleRecord] = []
+        self.__since = time.monotonic()
         self.rules = rules
 
-    def add(self, a: ArticleExtended) -> Optional[str]:
+    def add(self, a: Optional[ArticleRecord]) -> Optional[str]:
+        if a is None:
+            # the rules dropped it while parsing, count_rejection already recorded which one
+            self.__count("rejected")
+            return None
+
         if not self.__duplicate_checker.is_valid(a):
+            self.__count("duplicate")
             return None
 
         if a.archived and not self.rules.url_is_valid(a.actual_url, a.fake, a.archived):
+            self.__count("archived_source_rejected")
             return None
 
-        if not self.rules.pass_checks(a):
-            return None
+        if len(self.__list) == 0:
+            self.__since = time.monotonic()
 
         self.__list.append(a)
+        self.__count("appended")
         return f"{a.actual_url} appended"
 
+    @staticmethod
+    def __count(outcome: str):
+        registry.counter("evenflow_article_list", "articles offered to the storage batch", outcome=outcome).inc()
+
+    def is_due(self, size: int, age: float) -> bool:
+        if len(self.__list) == 0:
+            return False
+        return len(self.__list) >= size or time.monotonic() - self.__since >= age
+
+    def take(self) -> List[ArticleRecord]:
+        articles = self.__list
+        self.free_resources()
+        with RULES_SECONDS.time():
+            return self.rules.filter(articles)
+
     @property
-    def get(self) -> List[ArticleExtended]:
+    def get(self) -> List[ArticleRecord]:
         return self.__list
 
     def free_resources(self):
         self.__list = []
-        self.__duplicate_checker = DuplicateChecker()
 
 
 class CoroCreator:
-    def __init__(self, session: ClientSession, newspaper_conf: Configuration, timeout: Optional[int]):
+    def __init__(
+            self,
+            session: ClientSession,
+            parser: ArticleParser,
+            rules: ArticleRules,
+            timeout: Optional[int],
+            max_body: int = MAX_BODY_BYTES
+    ):
         self.session = session
-        self.newspaper_conf = newspaper_conf
+        self.parser = parser
+        self.rules = rules
         self.timeout = timeout
+        self.max_body = max_body
+
+    async def new_coro(self, link: str, item: Tuple[str, bool]) -> Either[Error, Optional[ArticleRecord]]:
+        with ARTICLE_SECONDS.time():
+            result = await self.__new_coro(link, item)
+        outcome = "error" if result.empty else ("ok" if result.on_right() is not None else "rejected")
+        registry.counter("evenflow_articles", "articles fetched, by outcome", outcome=outcome).inc()
+        return result
 
-    async def new_coro(self, link: str, item: Tuple[str, bool]) -> Either[Error, ArticleExtended]:
+    async def __new_coro(self, link: str, item: Tuple[str, bool]) -> Either[Error, Optional[ArticleRecord]]:
         source, fake = item
         try:
             scraper = article_factory(link=link, source=source, fake=fake)
-            article_wr = await scraper.get_data(self.session, self.newspaper_conf, self.timeout)
+            article_wr = await scraper.get_data(self.session, self.parser, self.timeout, self.max_body)
 
             if article_wr.empty:
                 err = article_wr.on_left()
@@ -223,32 +339,121 @@ class CoroCreator:
 
             return Right(article_wr.on_right())
 
+        except RejectedArticle as e:
+            self.rules.count_rejection(e.rule)
+            return Right(None)
+
         except Exception as e:
             return Left(Error.from_exception(exc=e, url=link, source=source, fake=fake))
 
 
-async def dispatch_links(conf: DispatcherSettings, queues: DispatcherQueues):
-    backup_manager = conf.make_backup_manager()
+class LinkBatch:
+    def __init__(self, state: Dict[str, Dict], size: int):
+        self.state = state
+        self.remaining = size
+
+    def link_done(self) -> bool:
+        self.remaining -= 1
+        return self.remaining == 0
 
-    async with conf.make_session() as session:
-        coro_creator = CoroCreator(session=session, newspaper_conf=conf.newspaper_conf, timeout=conf.timeout)
-        article_list = ArticleListManager(conf.rules)
 
+class LinkDispatcher:
+    def __init__(
+            self,
+            conf: DispatcherSettings,
+            queues: DispatcherQueues,
+            coro_creator: CoroCreator,
+            journal: CheckpointJournal
+    ):
+        self.conf = conf
+        self.queues = queues
+        self.coro_creator = coro_creator
+        self.journal = journal
+        self.pending = conf.make_scheduler()
+        self.retries = RetryQueue(conf.loop, conf.retry_policy, self.pending.put)
+        self.article_list = ArticleListManager(conf.rules, conf.duplicates)
+
+    def report(self) -> str:
+        pending = f"in flight: {self.pending.in_flight}, queued: {self.pending.queued}, {self.pending.report()}"
+        return f"{pending}, {self.retries.report()}, rejected: {self.conf.rules.report()}"
+
+    async def run(self):
+        tasks = [asyncio.ensure_future(self.__work(), loop=self.conf.loop) for _ in range(self.conf.max_in_flight)]
+        tasks.append(asyncio.ensure_future(self.__tick(), loop=self.conf.loop))
+        try:
+            while True:
+                # leave new batches in the links queue so that producers feel the backpressure
+                await self.pending.has_room()
+                await self.__receive()
+        finally:
+            self.retries.close()
+            for task in tasks:
+                task.cancel()
+
+    async def __receive(self):
+        links = await self.queues.receive_links()
+        batch = LinkBatch(links.state, 0)
+
+        # put never yields to the loop, so no worker can finish a link of this batch before it is fully counted
+        for link, item in links.filter(lambda url, item: self.conf.unpack_check(url, item)):
+            batch.remaining += 1
+            self.pending.put(link, item, batch)
+
+        if batch.remaining == 0:
+            await self.__complete(batch)
+
+    async def __work(self):
         while True:
-            links = await queues.receive_links()
-            extracted_data = links.filter(lambda url, item: conf.unpack_check(url, item))
+            link, item, batch, host = await self.pending.get()
+            start, error = time.monotonic(), None
+            try:
+                result = await self.coro_creator.new_coro(link, item)
+                error = result.on_left() if result.empty else None
+                if error is not None and self.retries.schedule(link, item, batch, error):
+                    continue
 
-            for result in await asyncio.gather(
-                    *[coro_creator.new_coro(link, item) for link, item in extracted_data.items]
-            ):
-                msg = result.map(lambda article: article_list.add(article))
-                msg.on_right(lambda m: print(m))
+                self.retries.forget(link, batch)
+                msg = result.map(lambda article: self.article_list.add(article))
+                msg.on_right(lambda m: logger.debug("%s", m) if m else None)
 
-                await result.on_left_awaitable(lambda e: queues.send_error(e))
+                await result.on_left_awaitable(lambda e: self.queues.send_error(e))
+            finally:
+                self.pending.done(host, time.monotonic() - start, error)
 
-            await queues.send_articles(article_list.get)
-            await backup_manager.store(extracted_data.state)
+            if self.article_list.is_due(self.conf.batch_size, self.conf.batch_age):
+                await self.__flush()
 
-            article_list.free_resources()
+            if batch.link_done():
+                await self.__complete(batch)
 
-            queues.mark_links()
+    async def __tick(self):
+        while True:
+            await asyncio.sleep(self.conf.batch_age)
+            if not self.pending.idle:
+                logger.info("%s", self.report())
+            if self.article_list.is_due(self.conf.batch_size, self.conf.batch_age):
+                await self.__flush()
+
+    async def __complete(self, batch: LinkBatch):
+        # the checkpoint must not get ahead of articles still buffered here, or a resume would skip them
+        await self.__flush()
+        await self.journal.store(batch.state)
+        self.queues.mark_links()
+
+    async def __flush(self):
+        articles = self.article_list.take()
+        if len(articles) > 0:
+            await self.queues.send_articles(articles)
+
+
+async def dispatch_links(conf: DispatcherSettings, queues: DispatcherQueues):
+    async with conf.make_session() as session:
+        with conf.make_parser() as parser, conf.make_journal() as journal:
+            coro_creator = CoroCreator(
+                session=session,
+                parser=parser,
+                rules=conf.rules,
+                timeout=conf.timeout,
+                max_body=conf.max_body
+            )
+            await LinkDispatcher(conf, queues, coro_creator, journal).run()
@@ -1,56 +1,183 @@
+import asyncio
+import logging
+import time
+
 from asyncpg.pool import Pool
+from asyncpg.connection import Connection
 from asyncio import Queue
-from typing import List, Optional
-from evenflow.dbops import QueryManager
-from evenflow.streams.messages import ArticleExtended, Error
+from typing import List, Optional, Set, Dict
+from evenflow.metrics import registry
+from evenflow.dbops import QueryManager, copy_merge, delete_errors_by_url, prune_stored_errors
+from evenflow.streams.messages import ArticleRecord, Error
+
+from .dispatcher import DuplicateChecker
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE = "UniqueViolationError"
+BATCH_SIZE = 500
+BATCH_AGE = 1.0
 
 
-async def store_articles(pool: Pool, storage_queue: Queue, error_queue: Queue, delete_queue: Optional[Queue] = None):
-    query_builder = QueryManager(columns=ArticleExtended.columns(), table='article')
+async def store_articles(
+        pool: Pool,
+        storage_queue: Queue,
+        error_queue: Queue,
+        delete_queue: Optional[Queue] = None,
+        duplicates: Optional[DuplicateChecker] = None
+):
+    query_builder = QueryManager(columns=ArticleRecord.columns(), table='article')
     while True:
-        articles: List[ArticleExtended] = await storage_queue.get()
-        print(f'received {len(articles)} articles')
+        articles: List[ArticleRecord] = await storage_queue.get()
+        logger.debug("received %d articles", len(articles))
         async with pool.acquire() as connection:
-            stmt = await connection.prepare(query_builder.make_insert() + " RETURNING url")
-            for article in articles:
-                try:
-                    value = await stmt.fetchval(*query_builder.sort_args(article.to_sql_dict()))
-                    print(f"stored {value}")
-                    if delete_queue is not None:
-                        await delete_queue.put(value)
-                except Exception as e:
-                    await error_queue.put(
-                        Error.from_exception(
-                            exc=e,
-                            url=article.url_to_visit,
-                            source=article.scraped_from,
-                            fake=article.fake
-                        )
-                    )
+            try:
+                with __db_timer("copy_merge"):
+                    stored = await __bulk_insert(connection, query_builder, articles, error_queue)
+            except Exception as e:
+                logger.warning("store_articles: %s, inserting one by one", e)
+                with __db_timer("insert_each"):
+                    stored = await __insert_each(connection, query_builder, articles, error_queue)
+
+        __count_rows("article", "stored", len(stored))
+        __count_rows("article", "rejected", len(articles) - len(stored))
+        logger.info("stored %d articles", len(stored))
+        for article in articles:
+            if article.actual_url not in stored:
+                continue
+            if duplicates is not None:
+                duplicates.stored(article)
+            if delete_queue is not None:
+                for url in {article.actual_url, article.url_to_visit}:
+                    await delete_queue.put(url)
 
         storage_queue.task_done()
 
 
-async def store_errors(pool: Pool, error_queue: Queue):
+async def __bulk_insert(conn: Connection, qm: QueryManager, articles: List[ArticleRecord], error_queue: Queue) -> Set:
+    rows = [tuple(qm.sort_args(article.to_sql_dict())) for article in articles]
+    stored = set(await copy_merge(conn, qm, rows, returning='url'))
+
+    for article in articles:
+        if article.actual_url not in stored:
+            await error_queue.put(
+                Error(
+                    msg=DUPLICATE,
+                    url=article.url_to_visit,
+                    source=article.scraped_from,
+                    fake=article.fake,
+                    info=f"{article.actual_url} already stored"
+                )
+            )
+
+    return stored
+
+
+async def __insert_each(conn: Connection, qm: QueryManager, articles: List[ArticleRecord], error_queue: Queue) -> Set:
+    stored = set()
+    stmt = await conn.prepare(qm.make_insert() + " RETURNING url")
+    for article in articles:
+        try:
+            stored.add(await stmt.fetchval(*qm.sort_args(article.to_sql_dict())))
+        except Exception as e:
+            await error_queue.put(
+                Error.from_exception(
+                    exc=e,
+                    url=article.url_to_visit,
+                    source=article.scraped_from,
+                    fake=article.fake
+                )
+            )
+    return stored
+
+
+async def store_errors(pool: Pool, error_queue: Queue, batch_size: int = BATCH_SIZE, batch_age: float = BATCH_AGE):
     query_builder = QueryManager(columns=Error.columns(), table='error')
     while True:
-        error: Error = await error_queue.get()
-        print(f'error to store:\t{error.url}\t{error.msg}')
+        received: List[Error] = await __drain(error_queue, batch_size, batch_age)
+        errors = __newest_by_url(received)
+        logger.debug("errors to store: %d", len(errors))
         async with pool.acquire() as connection:
             try:
-                await connection.execute(query_builder.make_insert(), *query_builder.sort_args(error.to_sql_dict()))
+                with __db_timer("store_errors"):
+                    await __insert_errors(connection, query_builder, errors)
+                __count_rows("error", "stored", len(errors))
             except Exception as e:
-                print(f'store_errors:\t{e}')
-        error_queue.task_done()
+                logger.error("store_errors: %s", e)
+        __mark_done(error_queue, received)
 
 
-async def delete_errors(pool: Pool, delete: Queue):
+async def delete_errors(pool: Pool, delete: Queue, batch_size: int = BATCH_SIZE, batch_age: float = BATCH_AGE):
     while True:
-        url = await delete.get()
-        print(f'deleting {url} from errors')
+        received: List[str] = await __drain(delete, batch_size, batch_age)
+        urls = list(set(received))
+        logger.debug("deleting %d urls from errors", len(urls))
         async with pool.acquire() as connection:
             try:
-                await connection.execute("DELETE FROM error WHERE url=$1", url)
+                with __db_timer("delete_errors"):
+                    await delete_errors_by_url(connection, urls)
+                __count_rows("error", "deleted", len(urls))
             except Exception as e:
-                print(f'delete_errors:\t{e}')
-        delete.task_done()
+                logger.error("delete_errors: %s", e)
+        __mark_done(delete, received)
+
+
+async def __insert_errors(conn: Connection, qm: QueryManager, errors: List[Error]):
+    rows = [qm.sort_args(error.to_sql_dict()) for error in errors]
+    urls = [error.url for error in errors]
+    upsert = qm.make_upsert(key='url', newer='creation_date')
+    try:
+        async with conn.transaction():
+            await conn.executemany(upsert, rows)
+            await prune_stored_errors(conn, urls)
+    except Exception as e:
+        logger.warning("store_errors: %s, inserting one by one", e)
+        for row in rows:
+            try:
+                await conn.execute(upsert, *row)
+            except Exception as row_exc:
+                logger.error("store_errors: %s", row_exc)
+        await prune_stored_errors(conn, urls)
+
+
+async def __drain(queue: Queue, size: int, age: float) -> List:
+    items = [await queue.get()]
+    deadline = time.monotonic() + age
+
+    while len(items) < size:
+        if not queue.empty():
+            items.append(queue.get_nowait())
+            continue
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        try:
+            items.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+        except asyncio.TimeoutError:
+            break
+
+    return items
+
+
+def __db_timer(operation: str):
+    return registry.histogram("evenflow_db_seconds", "time spent in database calls", operation=operation).time()
+
+
+def __count_rows(table: str, outcome: str, rows: int):
+    registry.counter("evenflow_rows", "rows written to the database", table=table, outcome=outcome).inc(rows)
+
+
+def __mark_done(queue: Queue, items: List):
+    for _ in items:
+        queue.task_done()
+
+
+def __newest_by_url(errors: List[Error]) -> List[Error]:
+    newest: Dict[str, Error] = {}
+    for error in errors:
+        current = newest.get(error.url)
+        if current is None or current.timestamp <= error.timestamp:
+            newest[error.url] = error
+    return list(newest.values())
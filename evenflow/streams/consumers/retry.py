@@ -0,0 +1,72 @@
+import asyncio
+import random
+
+from typing import Dict, Tuple, Any, Callable, List
+from evenflow.streams.messages import Error
+
+Put = Callable[[str, Tuple[str, bool], Any], None]
+# the same url can be in flight in two batches at once, each with its own attempts
+Key = Tuple[str, int]
+
+
+class RetryPolicy:
+    def __init__(self, attempts: int = 3, base_delay: float = 2.0, max_delay: float = 60.0, budget: int = 5000):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def delay(self, attempt: int) -> float:
+        """exponential backoff with full jitter, attempt starts at 1"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class RetryQueue:
+    """
+    puts links that failed for a transient reason back into the scheduler after a backoff;
+    the link keeps its batch open meanwhile, and no worker waits for the delay to expire
+    """
+
+    def __init__(self, loop: asyncio.events, policy: RetryPolicy, put: Put):
+        self.loop = loop
+        self.policy = policy
+        self.__put = put
+        self.__attempts: Dict[Key, int] = {}
+        self.__handles: Dict[Key, asyncio.Handle] = {}
+        self.spent = 0
+        self.given_up = 0
+
+    def schedule(self, link: str, item: Tuple[str, bool], batch: Any, error: Error) -> bool:
+        if not error.retryable:
+            return False
+
+        key = (link, id(batch))
+        attempt = self.__attempts.get(key, 0) + 1
+        if attempt > self.policy.attempts or self.spent >= self.policy.budget:
+            self.given_up += 1
+            return False
+
+        self.spent += 1
+        self.__attempts[key] = attempt
+        self.__handles[key] = self.loop.call_later(self.policy.delay(attempt), self.__due, link, item, batch)
+        return True
+
+    def __due(self, link: str, item: Tuple[str, bool], batch: Any):
+        self.__handles.pop((link, id(batch)), None)
+        self.__put(link, item, batch)
+
+    def forget(self, link: str, batch: Any):
+        self.__attempts.pop((link, id(batch)), None)
+
+    @property
+    def waiting(self) -> int:
+        return len(self.__handles)
+
+    def close(self):
+        handles: List[asyncio.Handle] = list(self.__handles.values())
+        for handle in handles:
+            handle.cancel()
+        self.__handles = {}
+
+    def report(self) -> str:
+        return f"retrying: {self.waiting}, retries: {self.spent}/{self.policy.budget}, given up: {self.given_up}"
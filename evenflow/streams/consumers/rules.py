@@ -0,0 +1,200 @@
+import abc
+
+from collections import Counter
+from typing import Optional, List, Dict, Callable, Iterable, Any, FrozenSet
+from evenflow.streams.messages import ArticleRecord
+from evenflow.urlman import functions
+
+TITLE, TEXT, PATH, URL = "title", "text", "path", "url"
+
+FIELDS = {
+    TITLE: "title",
+    TEXT: "text",
+    PATH: "path",
+    URL: "actual_url"
+}
+
+
+class Link:
+    __slots__ = ('actual_url', 'path')
+
+    def __init__(self, url: str):
+        self.actual_url = url
+        self.path = functions.maintain_path(url)
+
+
+class Rule(abc.ABC):
+    cost = 0
+
+    def __init__(self, name: str, field: Optional[str]):
+        self.name = name
+        self.field = field
+
+    def value_of(self, a: ArticleRecord) -> Any:
+        return a if self.field is None else getattr(a, FIELDS[self.field])
+
+    def passes(self, a: ArticleRecord) -> bool:
+        return self.check(self.value_of(a))
+
+    @abc.abstractmethod
+    def check(self, value: Any) -> bool:
+        pass
+
+
+class MinLength(Rule):
+    cost = 0
+
+    def __init__(self, field: str, threshold: int):
+        super().__init__(f"min_length.{field}", field)
+        self.threshold = int(threshold)
+
+    def check(self, value: str) -> bool:
+        return len(value) >= self.threshold
+
+
+class Blacklist(Rule):
+    cost = 1
+
+    def __init__(self, field: str, values: Iterable[str]):
+        super().__init__(f"blacklist.{field}", field)
+        self.values: FrozenSet[str] = frozenset(values)
+
+    def check(self, value: str) -> bool:
+        return value not in self.values
+
+
+class CustomCheck(Rule):
+    cost = 2
+
+    def __init__(self, name: str, field: Optional[str], check: Callable[[Any], bool]):
+        super().__init__(name, field)
+        self.__check = check
+
+    def check(self, value: Any) -> bool:
+        return self.__check(value)
+
+
+class RulePlan:
+    def __init__(self, rules: List[Rule]):
+        self.rules = tuple(sorted(self.__merge(rules), key=lambda rule: rule.cost))
+
+    def first_failure(self, a: ArticleRecord) -> Optional[Rule]:
+        for rule in self.rules:
+            if not rule.passes(a):
+                return rule
+        return None
+
+    def rejected_by(self, a: Any) -> Optional[str]:
+        failed = self.first_failure(a)
+        return failed.name if failed is not None else None
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def filter(self, candidates: List[ArticleRecord], hits: Counter) -> List[ArticleRecord]:
+        for rule in self.rules:
+            passed = [a for a in candidates if rule.passes(a)]
+            if len(passed) < len(candidates):
+                hits[rule.name] += len(candidates) - len(passed)
+            candidates = passed
+        return candidates
+
+    @staticmethod
+    def __merge(rules: List[Rule]) -> List[Rule]:
+        thresholds: Dict[str, int] = {}
+        blacklists: Dict[str, FrozenSet[str]] = {}
+        merged: List[Rule] = []
+
+        for rule in rules:
+            if isinstance(rule, MinLength):
+                thresholds[rule.field] = max(rule.threshold, thresholds.get(rule.field, 0))
+            elif isinstance(rule, Blacklist):
+                blacklists[rule.field] = rule.values | blacklists.get(rule.field, frozenset())
+            else:
+                merged.append(rule)
+
+        merged.extend(MinLength(field, threshold) for field, threshold in thresholds.items())
+        merged.extend(Blacklist(field, values) for field, values in blacklists.items())
+        return merged
+
+
+class ArticleRules:
+    def __init__(self, url_checker: Callable[[str, bool, bool], bool]):
+        self.__url_checker = url_checker
+        self.__rules: List[Rule] = []
+        self.__plans: Dict[str, RulePlan] = {}
+        self.hits: Counter = Counter()
+
+    def add_rule(self, rule: Rule):
+        self.__rules.append(rule)
+        self.__plans = {}
+
+    def add_check(self, check: Callable[[ArticleRecord], bool]):
+        self.add_rule(CustomCheck(f"custom.{len(self.__rules)}", None, check))
+
+    def add_field_check(self, field: str, check: Callable[[str], bool]):
+        self.add_rule(CustomCheck(f"custom.{field}.{len(self.__rules)}", field, check))
+
+    def add_title_check(self, check: Callable[[str], bool]):
+        self.add_field_check(TITLE, check)
+
+    def add_text_check(self, check: Callable[[str], bool]):
+        self.add_field_check(TEXT, check)
+
+    def add_path_check(self, check: Callable[[str], bool]):
+        self.add_field_check(PATH, check)
+
+    def add_url_check(self, check: Callable[[str], bool]):
+        self.add_field_check(URL, check)
+
+    def add_blacklist(self, field: str, values: Iterable[str]):
+        self.add_rule(Blacklist(field, values))
+
+    def add_min_length(self, field: str, threshold: int):
+        self.add_rule(MinLength(field, threshold))
+
+    @property
+    def plan(self) -> RulePlan:
+        return self.__compiled("all", lambda rule: True)
+
+    @property
+    def url_plan(self) -> RulePlan:
+        return self.__compiled("url", lambda rule: rule.field in {URL, PATH})
+
+    @property
+    def content_plan(self) -> RulePlan:
+        return self.__compiled(
+            "content",
+            lambda rule: rule.field in {TITLE, TEXT} and not isinstance(rule, CustomCheck)
+        )
+
+    def __compiled(self, stage: str, include: Callable[[Rule], bool]) -> RulePlan:
+        if stage not in self.__plans:
+            self.__plans[stage] = RulePlan([rule for rule in self.__rules if include(rule)])
+        return self.__plans[stage]
+
+    def url_is_valid(self, url: str, from_fake: bool, archived: bool) -> bool:
+        return self.__url_checker(url, from_fake, archived)
+
+    def pass_url_checks(self, url: str) -> bool:
+        failed = self.url_plan.first_failure(Link(url))
+        if failed is not None:
+            self.hits[failed.name] += 1
+            return False
+        return True
+
+    def pass_checks(self, a: ArticleRecord) -> bool:
+        failed = self.plan.first_failure(a)
+        if failed is not None:
+            self.hits[failed.name] += 1
+            return False
+        return True
+
+    def count_rejection(self, rule_name: str):
+        self.hits[rule_name] += 1
+
+    def filter(self, candidates: List[ArticleRecord]) -> List[ArticleRecord]:
+        return self.plan.filter(candidates, self.hits)
+
+    def report(self) -> str:
+        return ', '.join(f"{name}: {hits}" for name, hits in self.hits.most_common())
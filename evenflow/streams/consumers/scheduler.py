@@ -0,0 +1,239 @@
+import asyncio
+import time
+
+from collections import deque
+from typing import Optional, Dict, Deque, Tuple, Any, List
+from evenflow.streams.messages import Error
+from evenflow.urlman import host
+from evenflow.utreq import TokenBucket
+
+OK, THROTTLED, FAILED = "ok", "throttled", "failed"
+THROTTLING_STATUSES = {429, 503}
+TRANSIENT_ERRORS = {
+    "TimeoutError",
+    "ServerTimeoutError",
+    "ServerDisconnectedError",
+    "ClientConnectorError",
+    "ClientOSError"
+}
+
+Entry = Tuple[str, Tuple[str, bool], Any]
+
+
+def classify(error: Optional[Error]) -> str:
+    if error is None:
+        return OK
+    if error.status in THROTTLING_STATUSES:
+        return THROTTLED
+    if error.status is not None:
+        return FAILED if error.status >= 500 else OK
+    # anything else (parsing, rejections, 4xx) means the host answered
+    return FAILED if error.msg in TRANSIENT_ERRORS else OK
+
+
+class HostPolicy:
+    def __init__(
+            self,
+            rate: float = 2.0,
+            burst: float = 2.0,
+            min_rate: float = 0.1,
+            initial_concurrency: float = 2.0,
+            max_concurrency: float = 8.0,
+            target_latency: float = 2.0,
+            slow_latency: float = 10.0,
+            failure_threshold: int = 5,
+            cooldown: float = 30.0
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.slow_latency = slow_latency
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+
+class HostState:
+    """politeness and health of a single host: token bucket, AIMD concurrency and circuit breaker"""
+
+    def __init__(self, policy: HostPolicy):
+        self.policy = policy
+        self.pending: Deque[Entry] = deque()
+        self.bucket = TokenBucket(rate=policy.rate, capacity=policy.burst)
+        self.limit = policy.initial_concurrency
+        self.active = 0
+        self.failures = 0
+        self.open_until = 0.0
+
+    @property
+    def tripped(self) -> bool:
+        return time.monotonic() < self.open_until
+
+    @property
+    def saturated(self) -> bool:
+        return self.active >= int(self.limit)
+
+    @property
+    def idle(self) -> bool:
+        return len(self.pending) == 0 and self.active == 0 and not self.tripped
+
+    def ready(self) -> bool:
+        if self.tripped:
+            return False
+        return not self.saturated and self.bucket.try_acquire()
+
+    def delay(self) -> float:
+        return max(self.open_until - time.monotonic(), self.bucket.delay())
+
+    def record(self, outcome: str, latency: float):
+        policy = self.policy
+        if outcome == OK:
+            self.failures = 0
+            if latency > policy.slow_latency:
+                self.limit = max(1.0, self.limit / 2)
+            elif latency <= policy.target_latency:
+                self.limit = min(policy.max_concurrency, self.limit + 1 / self.limit)
+                self.bucket.rate = min(policy.rate, self.bucket.rate * 1.1)
+            return
+
+        self.failures += 1
+        self.limit = max(1.0, self.limit / 2)
+        if outcome == THROTTLED:
+            self.bucket.rate = max(policy.min_rate, self.bucket.rate / 2)
+
+        if self.failures >= policy.failure_threshold:
+            self.open_until = time.monotonic() + policy.cooldown
+            # half open once the cooldown expires: the next failure trips the breaker again
+            self.failures = policy.failure_threshold - 1
+
+
+class HostScheduler:
+    """
+    hands out pending links round-robin across hosts, only when the host has a token and
+    a free concurrency slot; links of hosts with an open circuit stay queued until it goes half open
+    """
+
+    def __init__(self, loop: asyncio.events, high_water: int, policy: Optional[HostPolicy] = None):
+        self.loop = loop
+        self.policy = policy if policy is not None else HostPolicy()
+        self.high_water = high_water
+        self.in_flight = 0
+        self.__hosts: Dict[str, HostState] = {}
+        self.__ring: Deque[str] = deque()
+        self.__queued = 0
+        self.__waiters: Deque[asyncio.Future] = deque()
+        self.__timer: Optional[asyncio.TimerHandle] = None
+        self.__room = asyncio.Event(loop=loop)
+        self.__room.set()
+
+    def put(self, link: str, item: Tuple[str, bool], batch: Any):
+        name = host(link)
+        state = self.__hosts.get(name)
+        if state is None:
+            state = self.__hosts[name] = HostState(self.policy)
+        if len(state.pending) == 0:
+            self.__ring.append(name)
+        state.pending.append((link, item, batch))
+
+        self.__queued += 1
+        if self.__queued >= self.high_water:
+            self.__room.clear()
+        self.__wake_one()
+
+    async def get(self) -> Tuple[str, Tuple[str, bool], Any, str]:
+        while True:
+            ready = self.__next_ready()
+            if ready is not None:
+                self.in_flight += 1
+                self.__queued -= 1
+                if self.__queued < self.high_water:
+                    self.__room.set()
+                # the next waiter either takes another ready link or arms the timer
+                self.__wake_one()
+                return ready
+
+            await self.__wait()
+
+    async def __wait(self):
+        # waiters are woken one at a time, by put, done or the timer for the next token or cooldown
+        self.__arm(self.__next_delay())
+        waiter = self.loop.create_future()
+        self.__waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if not waiter.cancelled():
+                # the wakeup meant for this worker goes to the next one
+                self.__wake_one()
+            elif waiter in self.__waiters:
+                self.__waiters.remove(waiter)
+            raise
+
+    def __arm(self, delay: Optional[float]):
+        if self.__timer is not None:
+            self.__timer.cancel()
+        self.__timer = self.loop.call_later(delay, self.__wake_one) if delay is not None else None
+
+    def __wake_one(self):
+        while len(self.__waiters) > 0:
+            waiter = self.__waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def __next_ready(self) -> Optional[Tuple[str, Tuple[str, bool], Any, str]]:
+        for _ in range(len(self.__ring)):
+            name = self.__ring.popleft()
+            state = self.__hosts[name]
+            if not state.ready():
+                self.__ring.append(name)
+                continue
+
+            link, item, batch = state.pending.popleft()
+            state.active += 1
+            if len(state.pending) > 0:
+                self.__ring.append(name)
+            return link, item, batch, name
+        return None
+
+    def __next_delay(self) -> Optional[float]:
+        delays: List[float] = [
+            self.__hosts[name].delay()
+            for name in self.__ring
+            if not self.__hosts[name].saturated
+        ]
+        return max(min(delays), 0.001) if len(delays) > 0 else None
+
+    def done(self, name: str, latency: float, error: Optional[Error]):
+        state = self.__hosts[name]
+        state.active -= 1
+        self.in_flight -= 1
+        state.record(classify(error), latency)
+
+        if state.tripped and len(state.pending) == 0 and state.active == 0:
+            # nothing queued would notice the cooldown expire, so the host is dropped when it does
+            self.loop.call_later(state.open_until - time.monotonic(), self.__prune, name)
+        self.__prune(name)
+        self.__wake_one()
+
+    def __prune(self, name: str):
+        state = self.__hosts.get(name)
+        if state is not None and state.idle:
+            del self.__hosts[name]
+
+    async def has_room(self):
+        await self.__room.wait()
+
+    @property
+    def queued(self) -> int:
+        return self.__queued
+
+    @property
+    def idle(self) -> bool:
+        return self.in_flight == 0 and self.__queued == 0
+
+    def report(self) -> str:
+        tripped = sum(1 for state in self.__hosts.values() if state.tripped)
+        return f"hosts tracked: {len(self.__hosts)}, open circuits: {tripped}"
@@ -3,3 +3,4 @@ from .error import Error
 from .collector_state import CollectorState
 from .data_keeper import DataKeeper
 from .article_extended import ArticleExtended
+from .article_record import ArticleRecord
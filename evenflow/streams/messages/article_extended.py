@@ -1,10 +1,9 @@
 from typing import Optional, Dict, List
-from bs4 import BeautifulSoup
 from newspaper import Article
 from newspaper.configuration import Configuration
 from datetime import datetime
-from evenflow import utreq
 from evenflow.urlman import functions
+from evenflow.utreq.documents import Document, LxmlDocument
 
 from .functions import (
     check_strings,
@@ -14,6 +13,7 @@ from .functions import (
 )
 
 from .storable import Storable
+from .article_record import ArticleRecord
 
 
 class ArticleExtended(Article, Storable):
@@ -37,16 +37,31 @@ class ArticleExtended(Article, Storable):
         self.fake = fake
         self.url_to_visit: str = url_to_visit
         self.scraped_from: str = scraped_from
-        self.soup: BeautifulSoup = utreq.soup_from_response(html)
+        self.__page: Optional[Document] = None
         self.actual_url: str = url_to_visit
         self.__text_length: Optional[int] = None
         self.scraped_date = datetime.now()
 
+    @property
+    def page(self) -> Document:
+        if self.__page is None:
+            # newspaper leaves clean_doc as None when it could not parse the page
+            self.__page = LxmlDocument(root=self.clean_doc) if self.clean_doc is not None else LxmlDocument(self.html)
+        return self.__page
+
     def correct_title(self) -> 'ArticleExtended':
         if self.title.strip().endswith("…"):
-            title_cmd = self.soup.select_one("title").text.strip()
-            index = self.__find_last(title_cmd)
-            self.set_title(title_cmd[:index] if index is not None else title_cmd)
+            title_tag = self.page.select_one("title")
+            if title_tag is not None:
+                title_cmd = title_tag.text.strip()
+                index = self.__find_last(title_cmd)
+                self.set_title(title_cmd[:index] if index is not None else title_cmd)
+        return self
+
+    def release_documents(self) -> 'ArticleExtended':
+        self.__page = None
+        self.html = self.article_html = ''
+        self.doc = self.clean_doc = self.top_node = self.clean_top_node = None
         return self
 
     def to_sql_dict(self) -> Dict[str, str]:
@@ -80,9 +95,12 @@ class ArticleExtended(Article, Storable):
     def path(self):
         return functions.maintain_path(self.actual_url)
 
+    def to_record(self) -> ArticleRecord:
+        return ArticleRecord(**self.to_sql_dict())
+
     @staticmethod
     def columns() -> List[str]:
-        return article_sql_fields()
+        return ArticleRecord.columns()
 
     def update_date(self) -> 'ArticleExtended':
         self.scraped_date = datetime.now()
@@ -110,6 +128,3 @@ class ArticleExtended(Article, Storable):
                 return maybe_index
         return None
 
-
-def article_sql_fields():
-    return list(ArticleExtended('<h1></h1>', '', '', do_nlp=False, fake=False).to_sql_dict().keys())
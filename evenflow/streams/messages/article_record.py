@@ -0,0 +1,74 @@
+from typing import Dict, List, Tuple
+from datetime import datetime
+from evenflow.urlman import functions
+
+from .storable import Storable
+
+COLUMNS = (
+    'title',
+    'text',
+    'description',
+    'url',
+    'visited_url',
+    'scraped_from',
+    'netloc',
+    'path',
+    'authors',
+    'images',
+    'videos',
+    'lang',
+    'keywords',
+    'section',
+    'publish_date',
+    'generator',
+    'summary',
+    'fake',
+    'scraped_date'
+)
+
+
+class ArticleRecord(Storable):
+    __slots__ = COLUMNS
+
+    def __init__(self, **fields):
+        for column in COLUMNS:
+            setattr(self, column, fields[column])
+
+    @staticmethod
+    def from_values(values: Tuple) -> 'ArticleRecord':
+        return ArticleRecord(**dict(zip(COLUMNS, values)))
+
+    def values(self) -> Tuple:
+        return tuple(getattr(self, column) for column in COLUMNS)
+
+    def __reduce__(self):
+        return ArticleRecord.from_values, (self.values(),)
+
+    def to_sql_dict(self) -> Dict:
+        return dict(zip(COLUMNS, self.values()))
+
+    @property
+    def actual_url(self) -> str:
+        return self.url
+
+    @property
+    def url_to_visit(self) -> str:
+        return self.visited_url
+
+    @property
+    def archived(self) -> bool:
+        return self.url != self.visited_url
+
+    def set_actual_url(self, url: str) -> 'ArticleRecord':
+        self.url = url
+        self.netloc = functions.strip(url)
+        self.path = functions.maintain_path(url)
+        return self
+
+    def update_date(self) -> 'ArticleRecord':
+        self.scraped_date = datetime.now()
+        return self
+
+    @staticmethod
+    def columns() -> List[str]:
+        return list(COLUMNS)
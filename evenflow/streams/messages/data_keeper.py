@@ -1,4 +1,4 @@
-from typing import Dict, Tuple, ItemsView, List, Callable, Optional
+from typing import Dict, Tuple, ItemsView, List, Callable, Optional, Iterator
 
 from dirtyfunc import Either
 from evenflow.streams.messages import Error, CollectorState
@@ -31,16 +31,13 @@ class DataKeeper:
         self.__links_to_send[url] = (source, mark_as_fake)
 
     def append_links(self, additional_links: Dict[str, Tuple[str, bool]]):
-        self.__links_to_send = {**self.__links_to_send, **additional_links}
+        self.__links_to_send.update(additional_links)
 
     def append_errors(self, additional_errors: List[Error]):
-        self.__errors = self.__errors + additional_errors
+        self.__errors.extend(additional_errors)
 
-    def filter(self, func: Callable[[str, Tuple[str, bool]], bool]) -> 'DataKeeper':
-        ret = DataKeeper(initial_state=self.state)
-        ret.append_links({k: v for k, v in self.__links_to_send.items() if func(k, v)})
-        ret.append_errors(self.errors)
-        return ret
+    def filter(self, func: Callable[[str, Tuple[str, bool]], bool]) -> Iterator[Tuple[str, Tuple[str, bool]]]:
+        return ((k, v) for k, v in self.__links_to_send.items() if func(k, v))
 
     def append_state(self, state: CollectorState) -> 'DataKeeper':
         name, data = state.unpack()
@@ -53,10 +50,16 @@ class DataKeeper:
             self.__state[name] = data
         return self
 
+    def __iadd__(self, other: 'DataKeeper') -> 'DataKeeper':
+        self.__state.update(other.state)
+        self.append_links(other.links_to_send)
+        self.append_errors(other.errors)
+        return self
+
     def __add__(self, other: 'DataKeeper') -> 'DataKeeper':
-        ret = DataKeeper(initial_state={**self.state, **other.state}, initial_links=self.links_to_send)
-        ret.append_links(other.links_to_send)
-        ret.append_errors(other.errors + self.errors)
+        ret = DataKeeper(initial_state=dict(self.state), initial_links=dict(self.links_to_send))
+        ret.append_errors(self.errors)
+        ret += other
         return ret
 
     @property
@@ -1,3 +1,4 @@
+from evenflow.utreq.retryable import is_retryable
 from .storable import Storable
 from typing import Optional, List
 from datetime import datetime
@@ -5,12 +6,23 @@ from datetime import datetime
 
 class Error(Storable):
 
-    def __init__(self, msg: str, url: str, fake: bool, info: Optional[str] = None, source: Optional[str] = None):
+    def __init__(
+            self,
+            msg: str,
+            url: str,
+            fake: bool,
+            info: Optional[str] = None,
+            source: Optional[str] = None,
+            status: Optional[int] = None,
+            retryable: bool = False
+    ):
         self.msg = msg
         self.url = url
         self.fake = fake
         self.info = info
         self.source = source
+        self.status = status
+        self.retryable = retryable
         self.timestamp = datetime.now()
 
     def to_sql_dict(self):
@@ -25,7 +37,15 @@ class Error(Storable):
 
     @staticmethod
     def from_exception(exc: Exception, url: str, fake: bool, source: Optional[str] = None) -> 'Error':
-        return Error(msg=type(exc).__name__, url=url, source=source, info=str(exc), fake=fake)
+        return Error(
+            msg=type(exc).__name__,
+            url=url,
+            source=source,
+            info=str(exc),
+            fake=fake,
+            status=getattr(exc, 'status', None),
+            retryable=is_retryable(exc)
+        )
 
     @staticmethod
     def __todict__(m: str, u: str, s: Optional[str], f: bool, i: Optional[str], t: datetime):
@@ -3,6 +3,7 @@ from typing import Dict, List
 
 
 class Storable(abc.ABC):
+    __slots__ = ()
 
     @abc.abstractmethod
     def to_sql_dict(self) -> Dict:
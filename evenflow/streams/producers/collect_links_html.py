@@ -1,76 +1,43 @@
 import asyncio
+import logging
 
-from typing import Dict, Tuple, List
+from typing import List, Optional
 from aiohttp import ClientSession
 from dirtyfunc import Option
-from evenflow.streams.messages import Error, DataKeeper, CollectorState
 from evenflow.scrapers.feed import FeedScraper, FeedResult
-
-
-class Sender:
-    def __init__(self):
-        self.__articles: DataKeeper = DataKeeper()
-        self.__backup: Dict[str, CollectorState] = {}
-        self.__feed_scrapers: List[FeedScraper] = []
-
-    def add_feed_scraper(self, reader: Option[FeedScraper]):
-        if not reader.empty:
-            self.__feed_scrapers.append(reader.on_value())
-
-    def get_feed_scrapers(self) -> List[FeedScraper]:
-        return self.__feed_scrapers
-
-    def merge_containers(self, articles: DataKeeper):
-        self.__articles = self.__articles + articles
-
-    def add_to_backup(self, s: CollectorState):
-        self.__backup[s.name] = s
-
-    def get_links(self) -> Dict[str, Tuple[str, bool]]:
-        return self.__articles.links_to_send
-
-    @property
-    def container(self) -> DataKeeper:
-        return self.__articles.append_states([v for v in self.__backup.values()])
-
-    @property
-    def errors(self) -> List[Error]:
-        return self.__articles.errors
-
-    def get_backup(self) -> Dict[str, CollectorState]:
-        return self.__backup
-
-
-class IterationManager:
-    def __init__(self, feed_scrapers: List[FeedScraper]):
-        self.__feed_scrapers = feed_scrapers
-
-    def has_feed_scrapers(self) -> bool:
-        return len(self.__feed_scrapers) > 0
-
-    def set_feed_scrapers(self, readers: List[FeedScraper]):
-        self.__feed_scrapers = readers
-
-    def get_feed_scrapers(self) -> List[FeedScraper]:
-        return self.__feed_scrapers
-
-
-async def collect_links_html(send_channel: asyncio.Queue, to_scrape: List[FeedScraper], session: ClientSession):
-    iteration_manager = IterationManager(to_scrape)
-
-    while iteration_manager.has_feed_scrapers():
-        feed_scrapers = iteration_manager.get_feed_scrapers()
-        print([feed_scraper.get_name() for feed_scraper in feed_scrapers])
-        sender = Sender()
-
-        for res in await asyncio.gather(*[feed_scraper.fetch_links(session) for feed_scraper in feed_scrapers]):
-            if res.empty:
-                print(res.on_left())
-                continue
-            feed_result: FeedResult = res.on_right()
-            sender.add_feed_scraper(feed_result.next)
-            sender.merge_containers(feed_result.articles)
-            sender.add_to_backup(feed_result.state)
-
-        await send_channel.put(sender.container)
-        iteration_manager.set_feed_scrapers(sender.get_feed_scrapers())
+from evenflow.utreq import HttpCache
+
+logger = logging.getLogger(__name__)
+
+
+async def follow_feed(
+        send_channel: asyncio.Queue,
+        feed_scraper: FeedScraper,
+        session: ClientSession,
+        cache: Optional[HttpCache] = None
+):
+    current = Option(feed_scraper)
+
+    while not current.empty:
+        feed_scraper = current.on_value()
+        logger.debug("fetching %s", feed_scraper.get_name())
+
+        res = await feed_scraper.fetch_links(session, cache)
+        if res.empty:
+            logger.warning("%s: %s", feed_scraper.get_name(), res.on_left())
+            return
+
+        feed_result: FeedResult = res.on_right()
+        await send_channel.put(feed_result.articles.append_state(feed_result.state))
+        current = feed_result.next
+
+
+async def collect_links_html(
+        send_channel: asyncio.Queue,
+        to_scrape: List[FeedScraper],
+        session: ClientSession,
+        cache: Optional[HttpCache] = None
+):
+    await asyncio.gather(*[follow_feed(send_channel, feed_scraper, session, cache) for feed_scraper in to_scrape])
+    if cache is not None:
+        logger.info("%s", cache.report())
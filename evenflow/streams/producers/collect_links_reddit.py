@@ -1,14 +1,35 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from praw import Reddit
 from asyncio import Queue
-from typing import Dict, Optional
+from typing import Dict, Optional, Iterator, List
 from evenflow.streams.messages import DataKeeper, CollectorState
+from evenflow.utreq import TokenBucket
+
+CONCURRENCY = 4
+# reddit allows 60 requests per minute to oauth clients, praw pages listings by 100
+REQUESTS_PER_SECOND = 1.0
+PAGE_SIZE = 100
 
 
 class RedditSettings:
-    def __init__(self, subreddits: Dict[str, bool], num_posts: int, instance: Reddit):
+    def __init__(
+            self,
+            subreddits: Dict[str, bool],
+            num_posts: int,
+            instance: Reddit,
+            concurrency: int = CONCURRENCY,
+            requests_per_second: float = REQUESTS_PER_SECOND,
+            page_size: int = PAGE_SIZE
+    ):
         self.subreddits = subreddits
         self.num_posts = num_posts
         self.instance = instance
+        self.concurrency = concurrency
+        self.requests_per_second = requests_per_second
+        self.page_size = page_size
 
     def sub(self, sub: str):
         return self.instance.subreddit(sub)
@@ -21,15 +42,50 @@ def add_domain(subreddit: str) -> str:
     return f"https://www.reddit.com/r/{subreddit}/"
 
 
-async def collect_links_reddit(rsm: RedditSettings, send_channel: Queue):
-    for subreddit in rsm.subreddits:
-        edk = DataKeeper()
-        tot = 0
-        for submission in rsm.sub(subreddit).top(time_filter='year', limit=rsm.num_posts):
-            subreddit_domain = add_domain(subreddit)
-            if submission.url != submission.permalink:
-                edk.append_link(submission.url, subreddit_domain, rsm.sub_is_fake(subreddit))
-                tot += 1
+def next_page(submissions: Iterator, size: int) -> List:
+    return list(islice(submissions, size))
+
+
+async def follow_subreddit(
+        rsm: RedditSettings,
+        subreddit: str,
+        send_channel: Queue,
+        semaphore: asyncio.Semaphore,
+        bucket: TokenBucket,
+        executor: ThreadPoolExecutor,
+        loop: asyncio.events
+):
+    subreddit_domain = add_domain(subreddit)
+    tot = 0
+
+    async with semaphore:
+        submissions = rsm.sub(subreddit).top(time_filter='year', limit=rsm.num_posts)
+        while True:
+            await bucket.acquire()
+            page = await loop.run_in_executor(executor, next_page, submissions, rsm.page_size)
+
+            edk = DataKeeper()
+            for submission in page:
+                if submission.url != submission.permalink:
+                    edk.append_link(submission.url, subreddit_domain, rsm.sub_is_fake(subreddit))
+                    tot += 1
+
+            is_over = len(page) < rsm.page_size
+            state = CollectorState(name=subreddit, is_over=is_over, data={'posts': tot})
+            await send_channel.put(edk.append_state(state))
+
+            if is_over:
+                return
+
+
+async def collect_links_reddit(rsm: RedditSettings, send_channel: Queue, loop: asyncio.events):
+    semaphore = asyncio.Semaphore(rsm.concurrency)
+    bucket = TokenBucket(rate=rsm.requests_per_second, capacity=rsm.concurrency)
 
-        state = CollectorState(name=subreddit, is_over=True, data={'posts': tot})
-        await send_channel.put(edk.append_state(state))
+    # praw's session, rate limiter and auth are shared by the one Reddit instance and are not thread safe;
+    # the bucket already paces the requests, so a single thread costs nothing
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        await asyncio.gather(*[
+            follow_subreddit(rsm, subreddit, send_channel, semaphore, bucket, executor, loop)
+            for subreddit in rsm.subreddits
+        ])
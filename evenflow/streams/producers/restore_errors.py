@@ -1,12 +1,15 @@
 from asyncio import Queue
+from typing import Optional
 from evenflow.dbops import select_errors, DatabaseCredentials
+from evenflow.shards import Shard
 from evenflow.streams.messages import DataKeeper
 
 
-async def restore_errors(send_channel: Queue, db_cred: DatabaseCredentials, fake: bool):
+async def restore_errors(send_channel: Queue, db_cred: DatabaseCredentials, fake: bool, shard: Optional[Shard] = None):
     dk = DataKeeper()
 
     for error in await db_cred.do_with_connection(lambda conn: select_errors(conn, fake=fake)):
-        dk.append_link(mark_as_fake=error["from_fake"], source=error["source_article"], url=error["url"])
+        if shard is None or shard.owns_url(error["url"]):
+            dk.append_link(mark_as_fake=error["from_fake"], source=error["source_article"], url=error["url"])
 
     await send_channel.put(dk)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import sys
+import time
+
+from collections import deque
+from functools import singledispatch
+from typing import Any, Dict, Optional
+from evenflow.metrics import registry
+from evenflow.streams.messages import ArticleRecord, DataKeeper, Error
+
+logger = logging.getLogger(__name__)
+
+LIMITS: Dict[str, Dict[str, int]] = {
+    "sources": {"maxsize": 64, "max_bytes": 32 << 20},
+    "articles": {"maxsize": 32, "max_bytes": 256 << 20},
+    "errors": {"maxsize": 4096, "max_bytes": 32 << 20},
+    "delete": {"maxsize": 8192, "max_bytes": 8 << 20}
+}
+
+
+@singledispatch
+def approx_size(item: Any) -> int:
+    return sys.getsizeof(item)
+
+
+@approx_size.register(str)
+def __str_size(item: str) -> int:
+    return len(item)
+
+
+@approx_size.register(list)
+@approx_size.register(tuple)
+def __sequence_size(item) -> int:
+    return sum(approx_size(element) for element in item)
+
+
+@approx_size.register(ArticleRecord)
+def __record_size(item: ArticleRecord) -> int:
+    return approx_size(item.values())
+
+
+@approx_size.register(Error)
+def __error_size(item: Error) -> int:
+    return len(item.url) + len(item.msg) + len(item.info or '') + len(item.source or '')
+
+
+@approx_size.register(DataKeeper)
+def __data_keeper_size(item: DataKeeper) -> int:
+    return sum(len(link) + len(source) for link, (source, _) in item.items)
+
+
+class BoundedQueue(asyncio.Queue):
+    """asyncio.Queue bounded both by item count and by the approximate size of its items"""
+
+    def __init__(
+            self,
+            maxsize: int = 0,
+            max_bytes: int = 0,
+            loop: Optional[asyncio.AbstractEventLoop] = None,
+            name: Optional[str] = None
+    ):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.peak_size = 0
+        self.peak_bytes = 0
+        self.blocked_puts = 0
+        self.blocked_seconds = 0.0
+        super().__init__(maxsize=maxsize, loop=loop)
+        if name is not None:
+            items = registry.gauge("evenflow_queue_items", "items waiting in a pipeline queue", queue=name)
+            items.set_function(self.qsize)
+            size = registry.gauge("evenflow_queue_bytes", "approximate bytes in a pipeline queue", queue=name)
+            size.set_function(lambda: self.bytes)
+        self.__waited = registry.histogram("evenflow_queue_wait_seconds", "time items spend queued", queue=name or "")
+        self.__blocked = registry.histogram("evenflow_queue_put_blocked_seconds", "time put() waited", queue=name or "")
+
+    def _init(self, maxsize: int):
+        super()._init(maxsize)
+        self._sizes = deque()
+
+    def _put(self, item: Any):
+        size = approx_size(item)
+        self._sizes.append((size, time.monotonic()))
+        self.bytes += size
+        super()._put(item)
+        self.peak_size = max(self.peak_size, self.qsize())
+        self.peak_bytes = max(self.peak_bytes, self.bytes)
+
+    def _get(self) -> Any:
+        size, since = self._sizes.popleft()
+        self.bytes -= size
+        self.__waited.observe(time.monotonic() - since)
+        return super()._get()
+
+    def full(self) -> bool:
+        if super().full():
+            return True
+        # a single oversized item is still let through an empty queue
+        return 0 < self.max_bytes <= self.bytes and self.qsize() > 0
+
+    async def put(self, item: Any):
+        if not self.full():
+            return await super().put(item)
+
+        start = time.monotonic()
+        try:
+            await super().put(item)
+        finally:
+            blocked = time.monotonic() - start
+            self.blocked_puts += 1
+            self.blocked_seconds += blocked
+            self.__blocked.observe(blocked)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.qsize(),
+            "bytes": self.bytes,
+            "peak_size": self.peak_size,
+            "peak_bytes": self.peak_bytes,
+            "blocked_puts": self.blocked_puts,
+            "blocked_seconds": round(self.blocked_seconds, 3)
+        }
+
+
+def make_queues(
+        loop: asyncio.AbstractEventLoop,
+        options: Optional[Dict[str, Dict[str, int]]] = None
+) -> Dict[str, BoundedQueue]:
+    options = options if options is not None else {}
+    return {
+        name: BoundedQueue(loop=loop, name=name, **{**limits, **options.get(name, {})})
+        for name, limits in LIMITS.items()
+    }
+
+
+def report(queues: Dict[str, BoundedQueue]) -> str:
+    return ', '.join(
+        f"{name}: {q.qsize()}/{q.maxsize} items, {q.bytes >> 10}KiB, "
+        f"blocked {q.blocked_puts}x for {q.blocked_seconds:0.1f}s"
+        for name, q in queues.items()
+    )
+
+
+async def report_every(queues: Dict[str, BoundedQueue], seconds: float):
+    while True:
+        await asyncio.sleep(seconds)
+        logger.info("queues: %s", report(queues))
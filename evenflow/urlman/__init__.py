@@ -1,2 +1,3 @@
 from .labelled_sources import LabelledSources
+from .seen_index import SeenIndex
 from .functions import *
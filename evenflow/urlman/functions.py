@@ -1,7 +1,8 @@
-import re
-
 from urllib.parse import urlparse
 
+SCHEMES = ('https://', 'http://')
+WWW = 'www.'
+
 
 def strip(url: str) -> str:
     return remove_prefix(maintain_netloc(url))
@@ -9,15 +10,38 @@ def strip(url: str) -> str:
 
 def remove_prefix(url: str) -> str:
     url = url.strip()
-    if url.startswith('http'):
-        url = re.sub(r'https?://', '', url, count=1)
-    if url.startswith('www.'):
-        url = re.sub(r'www.', '', url, count=1)
+    for scheme in SCHEMES:
+        if url.startswith(scheme):
+            url = url[len(scheme):]
+            break
+    if url.startswith(WWW):
+        url = url[len(WWW):]
     if url.endswith('/'):
         url = url[:len(url) - 1]
     return url
 
 
+def host(url: str) -> str:
+    """lowercased netloc of url without scheme, credentials, port and www. prefix"""
+    url = url.strip()
+    start = url.find('://')
+    if start < 0:
+        return ''
+    start += 3
+    end = len(url)
+    for delimiter in '/?#':
+        found = url.find(delimiter, start, end)
+        if found >= 0:
+            end = found
+    netloc = url[start:end]
+    netloc = netloc[netloc.rfind('@') + 1:]
+    colon = netloc.rfind(':')
+    if colon >= 0 and ']' not in netloc[colon:]:
+        netloc = netloc[:colon]
+    netloc = netloc.lower()
+    return netloc[len(WWW):] if netloc.startswith(WWW) else netloc
+
+
 def maintain_netloc(url: str) -> str:
     return str(urlparse(url).netloc)
 
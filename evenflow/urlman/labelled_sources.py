@@ -1,28 +1,76 @@
-from typing import List, Optional, Dict
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any
 
-from .functions import maintain_netloc, remove_prefix
+from .functions import host, remove_prefix
+
+CACHE_SIZE = 1 << 14
+LABEL = None
+
+
+class DomainTrie:
+    """suffix trie over reversed domain labels, so com.example matches news.example.com"""
+
+    def __init__(self):
+        self.__root: Dict[Any, Any] = {}
+
+    def insert(self, domain: str, label: str):
+        node = self.__root
+        for part in reversed(domain.split('.')):
+            node = node.setdefault(part, {})
+        node[LABEL] = label
+
+    def longest_suffix(self, domain: str) -> Optional[str]:
+        node, found = self.__root, None
+        for part in reversed(domain.split('.')):
+            node = node.get(part)
+            if node is None:
+                break
+            found = node.get(LABEL, found)
+        return found
 
 
 class LabelledSources:
-    def __init__(self, strip_path: bool):
+    def __init__(self, strip_path: bool, cache_size: int = CACHE_SIZE):
         self.__dict: Dict[str, str] = {}
+        self.__trie = DomainTrie()
+        self.__cache: 'OrderedDict[str, Optional[str]]' = OrderedDict()
+        self.__cache_size = cache_size
         self.__strip = strip_path
 
     def __setitem__(self, url: str, label: str):
-        self.__dict[self.__strip_if(url)] = label
+        key = self.__strip_if(url)
+        self.__dict[key] = label
+        if '/' not in key:
+            self.__trie.insert(key, label)
+        self.__cache.clear()
 
     def __contains__(self, url: str) -> bool:
-        return self.__strip_if(url) in self.__dict
+        return self[url] is not None
 
     def __getitem__(self, url: str) -> Optional[str]:
-        return self.__dict.get(self.__strip_if(url))
+        key = self.__strip_if(url)
+        try:
+            self.__cache.move_to_end(key)
+            return self.__cache[key]
+        except KeyError:
+            pass
+
+        label = self.__dict.get(key)
+        if label is None and '/' not in key:
+            label = self.__trie.longest_suffix(key)
+
+        self.__cache[key] = label
+        if len(self.__cache) > self.__cache_size:
+            self.__cache.popitem(last=False)
+        return label
 
     def strip(self, strip_path: bool) -> 'LabelledSources':
         self.__strip = strip_path
+        self.__cache.clear()
         return self
 
     def __strip_if(self, url: str) -> str:
-        return remove_prefix(maintain_netloc(url) if self.__strip else url)
+        return host(url) if self.__strip else remove_prefix(url).lower()
 
     def keys(self) -> List[str]:
         return [k for k in self.__dict]
@@ -0,0 +1,73 @@
+import hashlib
+import heapq
+
+from array import array
+from bisect import bisect_left
+from typing import Optional, Set, BinaryIO, Iterable, Iterator
+
+TYPECODE = 'Q'
+CHUNK = 1 << 16
+COMPACT_AT = 1 << 17
+
+
+def unique(keys: Iterable[int]) -> Iterator[int]:
+    """drops repeated keys from a sorted stream"""
+    last = None
+    for k in keys:
+        if k != last:
+            yield k
+            last = k
+
+
+def sort_keys(keys: array) -> array:
+    runs = [array(TYPECODE, sorted(keys[i:i + CHUNK])) for i in range(0, len(keys), CHUNK)]
+    return array(TYPECODE, unique(heapq.merge(*runs)))
+
+
+class SeenIndex:
+    def __init__(self, keys: Optional[array] = None):
+        self.__keys: array = sort_keys(keys) if keys is not None else array(TYPECODE)
+        self.__recent: Set[int] = set()
+
+    @staticmethod
+    def key(value: str) -> int:
+        digest = hashlib.blake2b(value.strip().encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little')
+
+    def add(self, value: str):
+        k = self.key(value)
+        if self.__sorted_contains(k):
+            return
+        self.__recent.add(k)
+        if len(self.__recent) >= COMPACT_AT:
+            self.compact()
+
+    def __contains__(self, value: str) -> bool:
+        k = self.key(value)
+        return k in self.__recent or self.__sorted_contains(k)
+
+    def __sorted_contains(self, k: int) -> bool:
+        i = bisect_left(self.__keys, k)
+        return i < len(self.__keys) and self.__keys[i] == k
+
+    def __len__(self) -> int:
+        return len(self.__keys) + len(self.__recent)
+
+    def compact(self):
+        if len(self.__recent) > 0:
+            recent = array(TYPECODE, sorted(self.__recent))
+            self.__keys = array(TYPECODE, unique(heapq.merge(self.__keys, recent)))
+            self.__recent = set()
+
+    def to_file(self, f: BinaryIO):
+        self.compact()
+        f.write(len(self.__keys).to_bytes(8, 'little'))
+        self.__keys.tofile(f)
+
+    @staticmethod
+    def from_file(f: BinaryIO) -> 'SeenIndex':
+        keys = array(TYPECODE)
+        keys.fromfile(f, int.from_bytes(f.read(8), 'little'))
+        index = SeenIndex()
+        index.__keys = keys
+        return index
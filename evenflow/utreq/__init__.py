@@ -1 +1,13 @@
-from .url2doc import soup_from_response, new_soup, get_html
+from .url2doc import soup_from_response, new_soup, new_document, get_html
+from .response import (
+    HttpStatusError,
+    TextError,
+    BodyRejectedError,
+    UnsupportedContentTypeError,
+    BodyTooLargeError,
+    MAX_BODY_BYTES
+)
+from .documents import Document, Node, LxmlDocument, make_document, PARSERS, HTML5LIB, LXML, LXML_CSS
+from .throttle import TokenBucket
+from .http_cache import HttpCache, CacheMissError
+from .retryable import is_retryable, RETRYABLE_STATUSES
@@ -0,0 +1,104 @@
+import abc
+
+from functools import lru_cache
+from typing import List, Optional, Callable, Dict
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+from lxml import etree, html as lxml_html
+from lxml.cssselect import CSSSelector
+
+HTML5LIB, LXML, LXML_CSS = "html5lib", "lxml", "lxml-css"
+
+
+class Node(abc.ABC):
+
+    @abc.abstractmethod
+    def get(self, attribute: str, default: Optional[str] = None) -> Optional[str]:
+        pass
+
+    @property
+    @abc.abstractmethod
+    def text(self) -> str:
+        pass
+
+    def __getitem__(self, attribute: str) -> str:
+        value = self.get(attribute)
+        if value is None:
+            raise KeyError(attribute)
+        return value
+
+
+class Document(abc.ABC):
+
+    @abc.abstractmethod
+    def select(self, selector: str) -> List[Node]:
+        pass
+
+    def select_one(self, selector: str) -> Optional[Node]:
+        nodes = self.select(selector)
+        return nodes[0] if len(nodes) > 0 else None
+
+
+class SoupNode(Node):
+    def __init__(self, tag: Tag):
+        self.__tag = tag
+
+    def get(self, attribute: str, default: Optional[str] = None) -> Optional[str]:
+        value = self.__tag.get(attribute, default)
+        return ' '.join(value) if isinstance(value, list) else value
+
+    @property
+    def text(self) -> str:
+        return self.__tag.text
+
+
+class SoupDocument(Document):
+    def __init__(self, text: str, features: str):
+        self.__soup = BeautifulSoup(text, features)
+
+    def select(self, selector: str) -> List[Node]:
+        return [SoupNode(tag) for tag in self.__soup.select(selector)]
+
+
+class LxmlNode(Node):
+    def __init__(self, element: lxml_html.HtmlElement):
+        self.__element = element
+
+    def get(self, attribute: str, default: Optional[str] = None) -> Optional[str]:
+        return self.__element.get(attribute, default)
+
+    @property
+    def text(self) -> str:
+        return self.__element.text_content()
+
+
+class LxmlDocument(Document):
+    def __init__(self, text: Optional[str] = None, root: Optional[lxml_html.HtmlElement] = None):
+        self.__root = root if root is not None else lxml_root(text)
+
+    def select(self, selector: str) -> List[Node]:
+        return [LxmlNode(element) for element in css_selector(selector)(self.__root)]
+
+
+def lxml_root(text: Optional[str]) -> lxml_html.HtmlElement:
+    """an empty page for text lxml cannot build a tree from, as BeautifulSoup does"""
+    try:
+        return lxml_html.document_fromstring(text)
+    except (etree.ParserError, ValueError, TypeError):
+        return lxml_html.Element("html")
+
+
+@lru_cache(maxsize=256)
+def css_selector(selector: str) -> CSSSelector:
+    return CSSSelector(selector, translator='html')
+
+
+PARSERS: Dict[str, Callable[[str], Document]] = {
+    HTML5LIB: lambda text: SoupDocument(text, HTML5LIB),
+    LXML: lambda text: SoupDocument(text, LXML),
+    LXML_CSS: LxmlDocument
+}
+
+
+def make_document(text: str, parser: str = HTML5LIB) -> Document:
+    return PARSERS[parser](text)
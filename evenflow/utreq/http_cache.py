@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+from collections import OrderedDict
+from typing import Optional, Dict, List, Callable, Any
+from aiohttp import ClientSession
+from dirtyfunc import Either, Left, Right
+
+from .response import HttpStatusError, read_text, MAX_BODY_BYTES
+
+MAX_BYTES = 256 << 20
+SUFFIX = ".cache"
+ETAG, LAST_MODIFIED, STORED_AT, URL = "etag", "last_modified", "stored_at", "url"
+
+
+class CacheMissError(Exception):
+    """raised in offline mode when a page was never cached"""
+    pass
+
+
+class CachedPage:
+    def __init__(self, meta: Dict, text: str):
+        self.meta = meta
+        self.text = text
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.meta[STORED_AT]
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.meta.get(ETAG) is not None:
+            headers["If-None-Match"] = self.meta[ETAG]
+        if self.meta.get(LAST_MODIFIED) is not None:
+            headers["If-Modified-Since"] = self.meta[LAST_MODIFIED]
+        return headers
+
+    def to_bytes(self) -> bytes:
+        meta = json.dumps(self.meta).encode('utf-8')
+        return len(meta).to_bytes(4, 'little') + meta + zlib.compress(self.text.encode('utf-8'))
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'CachedPage':
+        size = int.from_bytes(data[:4], 'little')
+        meta = json.loads(data[4:4 + size].decode('utf-8'))
+        return CachedPage(meta, zlib.decompress(data[4 + size:]).decode('utf-8'))
+
+
+def read_page(path: str) -> Optional[CachedPage]:
+    try:
+        with open(path, 'rb') as f:
+            return CachedPage.from_bytes(f.read())
+    except (OSError, ValueError, zlib.error):
+        return None
+
+
+def write_page(path: str, page: CachedPage) -> int:
+    data = page.to_bytes()
+    # one temporary file per thread, two stores of the same url may run at once
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def remove_files(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+async def run_blocking(f: Callable, *args) -> Any:
+    """file io and zlib on whole pages stay off the event loop"""
+    return await asyncio.get_event_loop().run_in_executor(None, f, *args)
+
+
+class HttpCache:
+    """
+    on-disk cache of GET responses, one zlib-compressed file per url.
+    Pages younger than ttl are served without a request, older ones are revalidated
+    with If-None-Match/If-Modified-Since; in offline mode nothing is requested at all.
+    The least recently used files are evicted once the directory exceeds max_bytes.
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            max_bytes: int = MAX_BYTES,
+            ttl: Optional[float] = None,
+            offline: bool = False
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self.__sizes: 'OrderedDict[str, int]' = self.__scan()
+        self.__total = sum(self.__sizes.values())
+
+    def __scan(self) -> 'OrderedDict[str, int]':
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(SUFFIX)]
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        return OrderedDict((e.path, e.stat().st_size) for e in entries)
+
+    def __path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest() + SUFFIX)
+
+    async def load(self, url: str) -> Optional[CachedPage]:
+        path = self.__path(url)
+        if path not in self.__sizes:
+            return None
+        page = await run_blocking(read_page, path)
+        if page is None:
+            await self.__forget(path)
+            return None
+        self.__sizes.move_to_end(path)
+        return page
+
+    async def store(self, url: str, page: CachedPage):
+        path = self.__path(url)
+        size = await run_blocking(write_page, path, page)
+
+        self.__total += size - self.__sizes.pop(path, 0)
+        self.__sizes[path] = size
+        await self.__evict()
+
+    async def __evict(self):
+        victims = []
+        while self.__total > self.max_bytes and len(self.__sizes) > 1:
+            path, size = self.__sizes.popitem(last=False)
+            self.__total -= size
+            victims.append(path)
+        if len(victims) > 0:
+            await run_blocking(remove_files, victims)
+
+    async def __forget(self, path: str):
+        self.__total -= self.__sizes.pop(path, 0)
+        await run_blocking(remove_files, [path])
+
+    def fresh(self, page: CachedPage) -> bool:
+        return self.offline or (self.ttl is not None and page.age < self.ttl)
+
+    async def get_html(
+            self,
+            url: str,
+            session: ClientSession,
+            max_bytes: int = MAX_BODY_BYTES
+    ) -> Either[Exception, str]:
+        cached = await self.load(url)
+        if cached is not None and self.fresh(cached):
+            self.hits += 1
+            return Right(cached.text)
+
+        if self.offline:
+            return Left(CacheMissError(f"{url} is not cached"))
+
+        headers = cached.conditional_headers() if cached is not None else {}
+        async with session.request(method="GET", url=url, headers=headers) as resp:
+            if resp.status == 304 and cached is not None:
+                self.revalidated += 1
+                cached.meta[STORED_AT] = time.time()
+                await self.store(url, cached)
+                return Right(cached.text)
+
+            if resp.status != 200:
+                return Left(HttpStatusError(url, resp.status))
+
+            self.misses += 1
+            maybe_text = await read_text(url, resp, max_bytes)
+            if not maybe_text.empty:
+                await self.store(url, CachedPage(
+                    meta={
+                        URL: url,
+                        ETAG: resp.headers.get("ETag"),
+                        LAST_MODIFIED: resp.headers.get("Last-Modified"),
+                        STORED_AT: time.time()
+                    },
+                    text=maybe_text.on_right()
+                ))
+            return maybe_text
+
+    def report(self) -> str:
+        return f"http cache: {self.hits} hits, {self.revalidated} revalidated, {self.misses} downloaded"
@@ -0,0 +1,87 @@
+import re
+
+from typing import Optional
+from aiohttp import ClientResponse
+from dirtyfunc import Either, Left, Right
+
+MAX_BODY_BYTES = 5 << 20
+CHUNK_SIZE = 64 << 10
+SNIFF_BYTES = 2048
+HTML_TYPES = frozenset({"text/html", "application/xhtml+xml", "text/plain"})
+FALLBACK_CHARSET = "utf-8"
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
+
+
+class HttpStatusError(Exception):
+    """raised when http response status is not 200"""
+
+    def __init__(self, url: str, status: int):
+        super().__init__(f'{url} responded with {status}')
+        self.status = status
+
+
+class TextError(Exception):
+    """raised when text is not a string"""
+    pass
+
+
+class BodyRejectedError(Exception):
+    """raised when a response body is refused before or while it is read"""
+    pass
+
+
+class UnsupportedContentTypeError(BodyRejectedError):
+    """raised when the declared content type is not html"""
+    pass
+
+
+class BodyTooLargeError(BodyRejectedError):
+    """raised when the body is, or declares to be, larger than the allowed ceiling"""
+    pass
+
+
+def check_headers(url: str, resp: ClientResponse, max_bytes: int) -> Optional[BodyRejectedError]:
+    # aiohttp reports a missing content type as application/octet-stream, only trust a declared one
+    if "Content-Type" in resp.headers and resp.content_type not in HTML_TYPES:
+        return UnsupportedContentTypeError(f"{url} declared {resp.content_type}")
+
+    if resp.content_length is not None and resp.content_length > max_bytes:
+        return BodyTooLargeError(f"{url} declared {resp.content_length} bytes, more than {max_bytes}")
+
+    return None
+
+
+def sniff_charset(body: bytes) -> Optional[str]:
+    match = META_CHARSET.search(body[:SNIFF_BYTES])
+    return match.group(1).decode('ascii') if match is not None else None
+
+
+def decode(body: bytes, declared: Optional[str]) -> str:
+    if declared is not None:
+        try:
+            return body.decode(declared, errors='replace')
+        except LookupError:
+            pass
+
+    sniffed = sniff_charset(body)
+    if sniffed is not None:
+        try:
+            return body.decode(sniffed, errors='replace')
+        except LookupError:
+            pass
+
+    return body.decode(FALLBACK_CHARSET, errors='replace')
+
+
+async def read_text(url: str, resp: ClientResponse, max_bytes: int = MAX_BODY_BYTES) -> Either[Exception, str]:
+    rejected = check_headers(url, resp, max_bytes)
+    if rejected is not None:
+        return Left(rejected)
+
+    body = bytearray()
+    async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            return Left(BodyTooLargeError(f"{url} sent more than {max_bytes} bytes"))
+
+    return Right(decode(bytes(body), resp.charset))
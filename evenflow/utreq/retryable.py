@@ -0,0 +1,14 @@
+import asyncio
+
+from aiohttp import ClientConnectionError, ClientPayloadError
+
+from .response import HttpStatusError
+
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def is_retryable(exc: Exception) -> bool:
+    """true for failures that may go away by asking again later: timeouts, dropped connections, 5xx"""
+    if isinstance(exc, HttpStatusError):
+        return exc.status in RETRYABLE_STATUSES
+    return isinstance(exc, (asyncio.TimeoutError, TimeoutError, ClientConnectionError, ClientPayloadError))
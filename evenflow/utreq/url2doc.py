@@ -4,30 +4,25 @@ from typing import Optional
 from dirtyfunc import Either, Left, Right
 from functools import partial
 import asyncio
+import time
 
-__DECODER = "html5lib"
-
+from evenflow.metrics import registry
 
-class HttpStatusError(Exception):
-    """raised when http response status is not 200"""
-    pass
+from .documents import Document, make_document, HTML5LIB
+from .http_cache import HttpCache
+from .response import HttpStatusError, read_text, MAX_BODY_BYTES
 
-
-class TextError(Exception):
-    """raised when text is not a string"""
-    pass
+__DECODER = "html5lib"
+FETCH_SECONDS = registry.histogram("evenflow_fetch_seconds", "time spent downloading a page")
+FETCHED_CHARS = registry.counter("evenflow_fetched_chars", "characters of html downloaded")
 
 
-async def __get_request(url: str, session: ClientSession) -> Either[Exception, str]:
+async def __get_request(url: str, session: ClientSession, max_bytes: int) -> Either[Exception, str]:
     async with session.request(method="GET", url=url) as resp:
         if resp.status != 200:
-            return Left(HttpStatusError(f'{url} responded with {resp.status}'))
+            return Left(HttpStatusError(url, resp.status))
 
-        text = await resp.text()
-        if text is None:
-            return Left(TextError(f"{url} didn't respond with a string"))
-
-        return Right(text)
+        return await read_text(url, resp, max_bytes)
 
 
 async def new_soup(url: str, session: ClientSession) -> Either[Exception, BeautifulSoup]:
@@ -35,13 +30,37 @@ async def new_soup(url: str, session: ClientSession) -> Either[Exception, Beauti
     return attempt.map(lambda response_text: soup_from_response(response_text))
 
 
-async def get_html(url: str, session: ClientSession, timeout: Optional[int] = None) -> Either[Exception, str]:
-    call = partial(__get_request, url, session)
+async def new_document(
+        url: str,
+        session: ClientSession,
+        parser: str = HTML5LIB,
+        cache: Optional[HttpCache] = None
+) -> Either[Exception, Document]:
+    attempt = await get_html(url, session, cache=cache)
+    return attempt.map(lambda response_text: make_document(response_text, parser))
+
+
+async def get_html(
+        url: str,
+        session: ClientSession,
+        timeout: Optional[int] = None,
+        cache: Optional[HttpCache] = None,
+        max_bytes: int = MAX_BODY_BYTES
+) -> Either[Exception, str]:
+    fetch = cache.get_html if cache is not None else __get_request
+    call = partial(fetch, url, session, max_bytes)
+    start = time.perf_counter()
     try:
         coro = asyncio.wait_for(call(), timeout=timeout) if timeout else call()
-        return await coro
+        result = await coro
     except Exception as e:
-        return Left(e)
+        result = Left(e)
+
+    FETCH_SECONDS.observe(time.perf_counter() - start)
+    outcome = "ok" if not result.empty else type(result.on_left()).__name__
+    registry.counter("evenflow_fetches", "pages requested, by outcome", outcome=outcome).inc()
+    result.on_right(lambda text: FETCHED_CHARS.inc(len(text)))
+    return result
 
 
 def soup_from_response(response_text: str) -> BeautifulSoup:
@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+from evenflow.streams.consumers import CheckpointJournal, replay_journal
+
+
+def test_journal_replay(tmp_path):
+    path = str(tmp_path / "backup.json")
+    journal = CheckpointJournal(path, {"a": {"is_over": False, "data": {"page": 1}}}, compact_every=100)
+
+    async def store():
+        await journal.store({"b": {"is_over": False, "data": {"page": 1}}})
+        await journal.store({"a": {"is_over": True, "data": {"page": 2}}})
+
+    asyncio.get_event_loop().run_until_complete(store())
+    expected = {"a": {"is_over": True, "data": {"page": 2}}, "b": {"is_over": False, "data": {"page": 1}}}
+    assert replay_journal(path) == expected
+
+    with open(path, 'a') as f:
+        f.write('["c", {"is_ov')
+    assert replay_journal(path) == expected
+
+    journal.close()
+    assert replay_journal(path) == expected
+    assert sum(1 for _ in open(path)) == 2
+
+
+def test_legacy_backup(tmp_path):
+    path = tmp_path / "backup.json"
+    legacy = {"a": {"is_over": True, "data": {}}}
+    path.write_text(json.dumps(legacy, indent=2))
+    assert replay_journal(str(path)) == legacy
+    assert replay_journal(str(tmp_path / "missing.json")) is None
+
+
+def test_shared_journal(tmp_path):
+    path = str(tmp_path / "backup.json")
+    initial = {"a": {"is_over": False, "data": {"page": 1}}, "b": {"is_over": False, "data": {"page": 1}}}
+    with open(path, 'w') as f:
+        json.dump(initial, f)
+
+    first = CheckpointJournal(path, initial, compact_every=2, shared=True)
+    second = CheckpointJournal(path, initial, compact_every=2, shared=True)
+
+    async def store():
+        await first.store({"a": {"is_over": False, "data": {"page": 2}}})
+        await second.store({"b": {"is_over": False, "data": {"page": 2}}})
+        await first.store({"a": {"is_over": False, "data": {"page": 3}}})
+        await second.store({"b": {"is_over": True, "data": {"page": 3}}})
+
+    asyncio.get_event_loop().run_until_complete(store())
+    expected = {"a": {"is_over": False, "data": {"page": 3}}, "b": {"is_over": True, "data": {"page": 3}}}
+    assert replay_journal(path) == expected
+
+    first.close()
+    second.close()
+    assert replay_journal(path) == expected
@@ -0,0 +1,43 @@
+from evenflow.streams.messages import DataKeeper, CollectorState
+
+SOURCE = "https://www.arcticfoxnews.com"
+
+
+def keeper(*urls: str) -> DataKeeper:
+    dk = DataKeeper()
+    for url in urls:
+        dk.append_link(url, SOURCE, False)
+    return dk
+
+
+def test_iadd_merges_in_place():
+    merged = keeper(f"{SOURCE}/polar-bear")
+    before = merged
+    merged += keeper(f"{SOURCE}/walrus").append_state(CollectorState(name="arctic", is_over=False, data={"page": 2}))
+
+    assert merged is before
+    assert set(merged.links_to_send) == {f"{SOURCE}/polar-bear", f"{SOURCE}/walrus"}
+    assert list(merged.state) == ["arctic"]
+
+
+def test_add_leaves_operands_untouched():
+    left, right = keeper(f"{SOURCE}/polar-bear"), keeper(f"{SOURCE}/walrus")
+    merged = left + right
+
+    assert len(merged.links_to_send) == 2
+    assert list(left.links_to_send) == [f"{SOURCE}/polar-bear"]
+    assert list(right.links_to_send) == [f"{SOURCE}/walrus"]
+
+
+def test_filter_is_lazy():
+    dk = keeper(*[f"{SOURCE}/{i}" for i in range(10)])
+    checked = []
+
+    def even(url: str, _) -> bool:
+        checked.append(url)
+        return int(url.rsplit('/', 1)[1]) % 2 == 0
+
+    selected = dk.filter(even)
+    assert checked == []
+    assert [url for url, _ in selected] == [f"{SOURCE}/{i}" for i in range(0, 10, 2)]
+    assert len(checked) == 10
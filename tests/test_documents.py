@@ -0,0 +1,51 @@
+import io
+import json
+
+from evenflow.utreq import PARSERS, HTML5LIB, LXML_CSS, make_document
+
+
+def load_corpus(path: str = './data/corpus/corpus.json'):
+    with io.open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_page(file_name: str) -> str:
+    with io.open(f'./data/corpus/{file_name}', 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def extract(text: str, parser: str, entry: dict):
+    page = make_document(text, parser)
+    attribute = entry.get("attribute", "href")
+    links = [node.get(attribute) for node in page.select(entry["links"])]
+    next_node = page.select_one(entry["next"])
+    next_page = next_node.get("href") or next_node.text.strip() if next_node is not None else None
+    labels = [node.text.lower().strip() for node in page.select(entry["condition"])] if "condition" in entry else []
+    return links, next_page, labels
+
+
+def test_documents_corpus():
+    for entry in load_corpus():
+        text = read_page(entry["file"])
+        baseline = extract(text, HTML5LIB, entry)
+
+        assert len(baseline[0]) == entry["expected_links"]
+        assert baseline[1] is not None
+
+        for parser in PARSERS:
+            assert extract(text, parser, entry) == baseline, f'{parser} differs on {entry["file"]}'
+
+
+def test_documents_missing_attribute():
+    for parser in PARSERS:
+        node = make_document('<html><body><a class="x">no href</a></body></html>', parser).select_one("a.x")
+        assert node.get("href") is None
+        assert node.text == "no href"
+        assert make_document('<p>nothing</p>', parser).select_one("a") is None
+
+
+def test_unparsable_text_is_an_empty_page():
+    for text in ['', '   ', None]:
+        page = make_document(text, LXML_CSS)
+        assert page.select("title") == []
+        assert page.select_one("title") is None
@@ -0,0 +1,44 @@
+import asyncio
+
+from evenflow.utreq import HttpCache, CacheMissError
+from evenflow.utreq.http_cache import CachedPage, STORED_AT, ETAG, LAST_MODIFIED
+
+
+def page(text: str, etag: str = None) -> CachedPage:
+    return CachedPage({STORED_AT: 0.0, ETAG: etag, LAST_MODIFIED: None}, text)
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def test_store_and_load(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    run(cache.store("https://example.com/", page("<html>hello</html>", etag='"abc"')))
+
+    reopened = HttpCache(str(tmp_path))
+    cached = run(reopened.load("https://example.com/"))
+    assert cached.text == "<html>hello</html>"
+    assert cached.conditional_headers() == {"If-None-Match": '"abc"'}
+    assert run(reopened.load("https://example.com/other")) is None
+
+
+def test_eviction(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=400)
+    for i in range(20):
+        run(cache.store(f"https://example.com/{i}", page(f"page {i} " * 10)))
+    assert run(cache.load("https://example.com/0")) is None
+    assert run(cache.load("https://example.com/19")) is not None
+    assert sum(f.stat().st_size for f in tmp_path.iterdir()) <= 400
+
+
+def test_offline(tmp_path):
+    cache = HttpCache(str(tmp_path), offline=True)
+    run(cache.store("https://example.com/", page("cached")))
+    loop = asyncio.get_event_loop()
+
+    hit = loop.run_until_complete(cache.get_html("https://example.com/", session=None))
+    assert hit.on_right() == "cached"
+
+    miss = loop.run_until_complete(cache.get_html("https://example.com/missing", session=None))
+    assert isinstance(miss.on_left(), CacheMissError)
@@ -1,4 +1,4 @@
-from evenflow.urlman import LabelledSources
+from evenflow.urlman import LabelledSources, host, remove_prefix
 
 
 def test_labelled():
@@ -6,3 +6,23 @@ def test_labelled():
     urls["https://www.arcticfoxnews.com/politics/polar-bear-wants-to-build-wall-along-canada-border"] = "mega"
     assert urls["https://www.arcticfoxnews.com/politics"] == "mega"
     assert ("arcticfoxnews.com" in urls.strip(strip_path=False)) is True
+
+
+def test_labelled_subdomains():
+    urls = LabelledSources(strip_path=False)
+    urls["https://www.example.com/"] = "low"
+    urls["politics.example.com"] = "high"
+    urls.strip(strip_path=True)
+
+    assert urls["https://news.example.com/a/b?c=d"] == "low"
+    assert urls["http://WWW.Example.com:8080/"] == "low"
+    assert urls["https://eu.politics.example.com/x"] == "high"
+    assert urls["https://notexample.com/"] is None
+    assert ("https://example.org/" in urls) is False
+
+
+def test_remove_prefix():
+    assert remove_prefix(" https://www.example.com/ ") == "example.com"
+    assert remove_prefix("http://wwwexample.com") == "wwwexample.com"
+    assert host("https://user@www.Example.com:443/path") == "example.com"
+    assert host("example.com/path") == ""
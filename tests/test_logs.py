@@ -0,0 +1,31 @@
+import logging
+
+from evenflow import logs
+from evenflow.logs import RateLimitFilter
+
+
+def record(msg: str, *args) -> logging.LogRecord:
+    return logging.LogRecord("evenflow.test", logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_templates_share_a_window(monkeypatch):
+    monkeypatch.setattr(logs.time, "monotonic", lambda: 100.0)
+    limit = RateLimitFilter(burst=2, period=10.0)
+
+    passed = [limit.filter(record("%s appended", f"https://a.com/{i}")) for i in range(5)]
+
+    assert passed == [True, True, False, False, False]
+    assert len(limit) == 1
+
+
+def test_stale_windows_are_evicted(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(logs.time, "monotonic", lambda: now[0])
+    limit = RateLimitFilter(burst=2, period=10.0)
+    for i in range(3):
+        limit.filter(record(f"message {i}"))
+    assert len(limit) == 3
+
+    now[0] += 10.0
+    assert limit.filter(record("message 0"))
+    assert len(limit) == 1
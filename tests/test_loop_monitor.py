@@ -0,0 +1,29 @@
+import asyncio
+import time
+
+from evenflow.loop_monitor import LoopMonitor
+
+
+def test_loop_monitor_names_the_blocking_task():
+    loop = asyncio.new_event_loop()
+    monitor = LoopMonitor(loop, interval=0.02, threshold=0.1, profile=True)
+
+    async def blocker():
+        await asyncio.sleep(0.1)
+        time.sleep(0.5)
+
+    async def run():
+        sampler = asyncio.ensure_future(monitor.run(), loop=loop)
+        await blocker()
+        await asyncio.sleep(0.1)
+        sampler.cancel()
+
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+
+    task, seconds = monitor.blocked.most_common(1)[0]
+    assert task == "test_loop_monitor_names_the_blocking_task.<locals>.run"
+    assert 0.3 < seconds < 0.6
+    assert "blocked by" in monitor.report()
@@ -0,0 +1,35 @@
+from evenflow.metrics import Registry, Histogram, bucket_of, bucket_bounds
+
+
+def test_histogram_quantiles():
+    histogram = Histogram()
+    for ms in range(1, 1001):
+        histogram.observe(ms / 1000)
+
+    assert histogram.count == 1000
+    assert abs(histogram.quantile(0.5) - 0.5) / 0.5 < 0.035
+    assert abs(histogram.quantile(0.99) - 0.99) / 0.99 < 0.035
+    assert histogram.quantile(1.0) == 1.0
+
+
+def test_buckets_bound_values():
+    for value in [1e-6, 0.003, 0.5, 1.0, 7.3, 12345.0]:
+        lower, upper = bucket_bounds(bucket_of(value))
+        assert lower <= value < upper
+        assert (upper - lower) / lower <= 1 / 16
+
+
+def test_prometheus_text():
+    registry = Registry()
+    registry.counter("evenflow_fetches", "pages", outcome="ok").inc(3)
+    registry.gauge("evenflow_queue_items", "items", queue="articles").set_function(lambda: 7)
+    registry.histogram("evenflow_db_seconds", "db").observe(0.25)
+
+    text = registry.to_prometheus()
+    assert '# HELP evenflow_fetches_total pages' in text
+    assert '# TYPE evenflow_fetches_total counter' in text
+    assert 'evenflow_fetches_total{outcome="ok"} 3.0' in text
+    assert 'evenflow_queue_items{queue="articles"} 7' in text
+    assert '# TYPE evenflow_db_seconds summary' in text
+    assert 'evenflow_db_seconds_count 1' in text
+    assert registry.snapshot()["evenflow_fetches"]['{outcome="ok"}'] == 3.0
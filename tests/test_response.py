@@ -0,0 +1,14 @@
+from evenflow.utreq.response import decode, sniff_charset
+
+
+def test_declared_charset_wins():
+    body = "perché".encode("latin-1")
+    assert decode(body, "latin-1") == "perché"
+
+
+def test_fallback_when_missing():
+    meta = '<html><head><meta charset="iso-8859-1"></head><body>città</body></html>'
+    assert sniff_charset(meta.encode("latin-1")) == "iso-8859-1"
+    assert "città" in decode(meta.encode("latin-1"), None)
+    assert decode("città".encode("utf-8"), None) == "città"
+    assert decode("città".encode("utf-8"), "not-a-charset") == "città"
@@ -0,0 +1,28 @@
+import asyncio
+
+from evenflow.streams.consumers.retry import RetryQueue, RetryPolicy
+from evenflow.streams.messages import Error
+
+URL = "https://www.arcticfoxnews.com/polar-bear"
+
+
+def test_same_url_in_two_batches():
+    loop = asyncio.new_event_loop()
+    put = []
+    policy = RetryPolicy(attempts=1, base_delay=0.01, max_delay=0.01)
+    retries = RetryQueue(loop, policy, lambda *entry: put.append(entry))
+    first, second = object(), object()
+    error = Error(msg="TimeoutError", url=URL, fake=False, retryable=True)
+
+    assert retries.schedule(URL, ("source", False), first, error) is True
+    assert retries.schedule(URL, ("source", False), second, error) is True
+    assert retries.waiting == 2
+
+    try:
+        loop.run_until_complete(asyncio.sleep(0.05))
+    finally:
+        loop.close()
+
+    assert {id(batch) for _, _, batch in put} == {id(first), id(second)}
+    assert retries.waiting == 0
+    assert retries.schedule(URL, ("source", False), first, error) is False
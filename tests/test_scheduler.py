@@ -0,0 +1,62 @@
+import asyncio
+
+from evenflow.streams.consumers.scheduler import HostScheduler, HostPolicy
+from evenflow.streams.messages import Error
+
+URL = "https://www.arcticfoxnews.com/polar-bear"
+ITEM = ("source", False)
+
+
+def test_open_circuit_keeps_links_queued():
+    loop = asyncio.new_event_loop()
+    policy = HostPolicy(rate=100.0, burst=10.0, failure_threshold=1, cooldown=0.05)
+    scheduler = HostScheduler(loop, high_water=10, policy=policy)
+    error = Error(msg="TimeoutError", url=URL, fake=False, retryable=True)
+
+    async def scenario():
+        scheduler.put(URL, ITEM, None)
+        scheduler.put(f"{URL}/cubs", ITEM, None)
+        _, _, _, name = await scheduler.get()
+        scheduler.done(name, 0.1, error)
+
+        start = loop.time()
+        link, _, _, _ = await asyncio.wait_for(scheduler.get(), timeout=1)
+        return link, loop.time() - start
+
+    try:
+        link, waited = loop.run_until_complete(scenario())
+    finally:
+        loop.close()
+
+    assert link == f"{URL}/cubs"
+    assert waited >= 0.04
+    assert scheduler.in_flight == 1
+
+
+def test_put_wakes_one_worker_and_idle_hosts_are_dropped():
+    loop = asyncio.new_event_loop()
+    scheduler = HostScheduler(loop, high_water=10)
+    got = []
+
+    async def worker():
+        link, _, _, name = await scheduler.get()
+        got.append(link)
+        scheduler.done(name, 0.1, None)
+
+    async def scenario():
+        workers = [loop.create_task(worker()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        scheduler.put(URL, ITEM, None)
+        await asyncio.sleep(0.01)
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    try:
+        loop.run_until_complete(scenario())
+    finally:
+        loop.close()
+
+    assert got == [URL]
+    assert scheduler.idle
+    assert scheduler.report().startswith("hosts tracked: 0")
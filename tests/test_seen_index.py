@@ -0,0 +1,40 @@
+import io
+
+from array import array
+from evenflow.urlman import SeenIndex
+
+
+def test_seen_index():
+    stored = [f"https://www.arcticfoxnews.com/politics/{i}" for i in range(1000)]
+    seen = SeenIndex(array('Q', [SeenIndex.key(url) for url in stored]))
+    seen.add("https://www.arcticfoxnews.com/polar-bear")
+
+    assert (stored[42] in seen) is True
+    assert (f" {stored[7]} " in seen) is True
+    assert ("https://www.arcticfoxnews.com/polar-bear" in seen) is True
+    assert ("https://www.arcticfoxnews.com/walrus" in seen) is False
+    assert len(seen) == 1001
+
+
+def test_seen_index_file():
+    seen = SeenIndex()
+    seen.add("https://www.arcticfoxnews.com/polar-bear")
+
+    f = io.BytesIO()
+    seen.to_file(f)
+    f.seek(0)
+    restored = SeenIndex.from_file(f)
+
+    assert ("https://www.arcticfoxnews.com/polar-bear" in restored) is True
+    assert len(restored) == 1
+
+
+def test_seen_index_counts_each_key_once():
+    url = "https://www.arcticfoxnews.com/polar-bear"
+    seen = SeenIndex(array('Q', [SeenIndex.key(url), SeenIndex.key(url)]))
+    seen.add(url)
+    seen.add("https://www.arcticfoxnews.com/walrus")
+    seen.add("https://www.arcticfoxnews.com/walrus")
+    seen.compact()
+
+    assert len(seen) == 2
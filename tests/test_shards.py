@@ -0,0 +1,47 @@
+from evenflow.shards import Shard, shard_of, split_dispatcher, split_http_cache
+from evenflow.streams.consumers.scheduler import HostPolicy
+
+
+def test_shard_of_is_stable():
+    # crc32, so the same host lands on the same shard in every process and every run
+    assert shard_of("arcticfoxnews.com", 4) == 3
+    assert shard_of("arcticfoxnews.com", 1) == 0
+
+
+def test_every_host_has_one_owner():
+    shards = [Shard(i, 3) for i in range(3)]
+    for url in [f"https://www.site{i}.com/politics/{i}" for i in range(100)]:
+        assert sum(1 for shard in shards if shard.owns_url(url)) == 1
+    assert Shard(0, 3).owns_url("https://www.site7.com/a") == Shard(0, 3).owns_url("http://site7.com/b")
+
+
+def test_split_limits():
+    shards = [Shard(i, 3) for i in range(3)]
+    assert sum(shard.split(10) for shard in shards) == 10
+    assert [shard.split(2, minimum=1) for shard in shards] == [1, 1, 1]
+
+    options = split_dispatcher({"max_in_flight": 64, "parse_workers": 0}, shards[0], 64, HostPolicy())
+    assert options["max_in_flight"] == 22
+    assert options["parse_workers"] == 0
+    assert options["shared_journal"] is True
+
+
+def test_split_host_limits():
+    shard = Shard(1, 4)
+    options = split_dispatcher({"hosts": {"rate": 8.0, "cooldown": 5.0}}, shard, 64, HostPolicy())
+    policy = HostPolicy(**options["hosts"])
+
+    # four workers together stay within the configured per-host budget
+    assert policy.rate * shard.count == 8.0
+    assert policy.max_concurrency * shard.count == HostPolicy().max_concurrency
+    assert policy.burst == 1.0
+    assert policy.cooldown == 5.0
+
+
+def test_split_http_cache():
+    options = {"directory": "cache", "ttl": 60}
+    caches = [split_http_cache(options, Shard(index, 3), 300) for index in range(3)]
+
+    assert [cache["directory"] for cache in caches] == ["cache.0", "cache.1", "cache.2"]
+    assert sum(cache["max_bytes"] for cache in caches) == 300
+    assert all(cache["ttl"] == 60 for cache in caches)